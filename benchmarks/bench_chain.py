@@ -0,0 +1,49 @@
+"""
+Compares a fused _.chain pipeline against the same pipeline written as nested collection calls.
+
+    python -m benchmarks.bench_chain [number_of_records]
+"""
+import sys
+import time
+from collections import deque
+
+import underscore as _
+
+
+def records(n):
+    return [{"id": i, "score": i % 97, "kind": "click" if i % 3 else "view"} for i in range(n)]
+
+
+def nested(data):
+    scored = _.map(data, lambda r: {"id": r["id"], "score": r["score"] * 2, "kind": r["kind"]})
+    clicks = _.where(scored, {"kind": "click"})
+    high = _.select(clicks, lambda r: r["score"] > 50)
+    ids = _.pluck(high, "id")
+    return _.reject(ids, lambda i: i % 7 == 0)
+
+
+def fused(data):
+    return (_.chain(data)
+            .map(lambda r: {"id": r["id"], "score": r["score"] * 2, "kind": r["kind"]})
+            .where({"kind": "click"})
+            .select(lambda r: r["score"] > 50)
+            .pluck("id")
+            .reject(lambda i: i % 7 == 0))
+
+
+def throughput(pipeline, data, repeat=3):
+    best = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        deque(pipeline(data), maxlen=0)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(data) / best
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    data = records(n)
+    assert list(nested(data)) == list(fused(data))
+    for name, pipeline in (("nested generators", nested), ("fused chain", fused)):
+        print("{0:<20} {1:>12,.0f} records/s".format(name, throughput(pipeline, data)))
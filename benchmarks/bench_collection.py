@@ -0,0 +1,91 @@
+"""
+Per element cost of the collection functions against the hand-written generators they replaced.
+
+    python -m benchmarks.bench_collection [number_of_elements]
+"""
+import sys
+import time
+from collections import deque
+
+from underscore import collection as _
+
+
+def generator_each(iterable, iteratee):
+    for value in iterable:
+        iteratee(value)
+        yield value
+
+
+def generator_map(iterable, iteratee):
+    for item in iterable:
+        yield iteratee(item)
+
+
+def generator_indexed_map(iterable, iteratee):
+    for index, item in enumerate(iterable):
+        yield iteratee(item, index)
+
+
+def generator_select(iterable, conditional):
+    for index, item in enumerate(iterable):
+        if conditional(item, index):
+            yield item
+
+
+def generator_find(iterable, conditional):
+    for element in iterable:
+        if conditional(element):
+            yield element
+            break
+
+
+def interpreted_where(iterable, properties):
+    # walks the query for every record, as an interpreter of the query language would
+    operators = {'$gt': lambda a, b: a > b, '$lt': lambda a, b: a < b, '$in': lambda a, b: a in b}
+    for record in iterable:
+        for field, condition in properties.items():
+            if field not in record:
+                break
+            if isinstance(condition, dict):
+                if not all(operators[operator](record[field], value) for operator, value in condition.items()):
+                    break
+            elif record[field] != condition:
+                break
+        else:
+            yield record
+
+
+def cost(make_iterator, n, repeat=3):
+    best = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        deque(make_iterator(), maxlen=0)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / n * 1e9
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    data = list(range(n))
+    is_odd = lambda x: x & 1
+    is_odd_index = lambda x, i: i & 1
+    never = lambda x: x < 0
+    # builtins like max can not be inspected and are called with the value only, a python wrapper is used for both sides
+    max = lambda x, i: x if x > i else i
+    records = [{"id": i, "age": i % 90, "tag": "t%d" % (i % 7)} for i in range(n)]
+    query = {"age": {"$gt": 30, "$lt": 60}, "tag": {"$in": ["t1", "t3"]}}
+    cases = [
+        ("each", lambda: generator_each(data, abs), lambda: _.each(data, abs)),
+        ("each over a generator", lambda: generator_each(iter(data), abs), lambda: _.each(iter(data), abs)),
+        ("map", lambda: generator_map(data, abs), lambda: _.map(data, abs)),
+        ("map with index", lambda: generator_indexed_map(data, max), lambda: _.map(data, max)),
+        ("select with index", lambda: generator_select(data, is_odd_index), lambda: _.select(data, is_odd_index)),
+        ("reject with index", lambda: generator_select(data, is_odd_index), lambda: _.reject(data, is_odd_index)),
+        ("select", lambda: generator_select(data, lambda x, i: is_odd(x)), lambda: _.select(data, is_odd)),
+        ("find", lambda: generator_find(data, never), lambda: _.find(data, never)),
+        ("where with operators", lambda: interpreted_where(records, query), lambda: _.where(records, query)),
+    ]
+    print("{0:<20} {1:>12} {2:>12}".format("function", "generator", "underscore"))
+    for name, before, after in cases:
+        print("{0:<20} {1:>10.1f}ns {2:>10.1f}ns".format(name, cost(before, n), cost(after, n)))
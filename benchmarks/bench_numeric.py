@@ -0,0 +1,54 @@
+"""
+collection functions against their underscore.numeric counterparts on a large array of numbers.
+
+    python -m benchmarks.bench_numeric [number_of_elements]
+"""
+import operator
+import sys
+import time
+
+from underscore import collection as _
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def cost(func, repeat=3):
+    best = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    if numpy is None:
+        sys.exit("NumPy is not installed")
+    from underscore import numeric
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    array = numpy.random.RandomState(0).randint(0, 1000, n)
+    values = array.tolist()
+    is_even = lambda x: x % 2 == 0
+    triple = lambda x: x * 3
+    by_tens = lambda x: x // 10
+    cases = [
+        ("map", lambda: list(_.map(values, triple)), lambda: numeric.map(array, triple)),
+        ("select", lambda: list(_.select(values, is_even)), lambda: numeric.select(array, is_even)),
+        ("reject", lambda: list(_.reject(values, is_even)), lambda: numeric.reject(array, is_even)),
+        ("partition", lambda: [list(side) for side in _.partition(values, is_even)], lambda: numeric.partition(array, is_even)),
+        ("reduce", lambda: _.reduce(values, operator.add, 0), lambda: numeric.reduce(array, operator.add, 0)),
+        ("max", lambda: _.max(values), lambda: numeric.max(array)),
+        ("min", lambda: _.min(values), lambda: numeric.min(array)),
+        ("sort_by", lambda: _.sort_by(values, key_func=by_tens), lambda: numeric.sort_by(array, by_tens)),
+        ("count_by", lambda: _.count_by(values, by_tens), lambda: numeric.count_by(array, by_tens)),
+        ("sample", lambda: _.sample(values, 1000, seed=1), lambda: numeric.sample(array, 1000, seed=1)),
+    ]
+    print("{0} elements".format(n))
+    print("{0:<12} {1:>10} {2:>10} {3:>8}".format("function", "python", "numpy", "speedup"))
+    for name, pure, vectorized in cases:
+        before, after = cost(pure), cost(vectorized)
+        print("{0:<12} {1:>9.3f}s {2:>9.3f}s {3:>7.1f}x".format(name, before, after, before / after))
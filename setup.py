@@ -11,6 +11,7 @@ setup(
     name='underscore',
     version='0.5',
     packages=find_packages(),
+    extras_require={'numeric': ['numpy']},
     include_package_data=True,
     license='MIT License',  # example license
     description='Python port of underscore.js library',
@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import time
+import unittest
+from underscore import aio
+
+
+async def agen(values):
+    for value in values:
+        await asyncio.sleep(0)
+        yield value
+
+
+async def slow_double(x):
+    await asyncio.sleep(0.05)
+    return x * 2
+
+
+async def collect(async_iterable):
+    return [value async for value in async_iterable]
+
+
+def synchronous(test):
+    @functools.wraps(test)
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(test(self))
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            asyncio.set_event_loop(None)
+            loop.close()
+    return run
+
+
+class TestAioMap(unittest.TestCase):
+
+    @synchronous
+    async def test_async_source_and_iteratee(self):
+        self.assertEqual(await collect(aio.map(agen([1, 2, 3]), slow_double)), [2, 4, 6])
+
+    @synchronous
+    async def test_plain_source_and_iteratee(self):
+        self.assertEqual(await collect(aio.map([1, 2, 3], lambda x, i: x * i)), [0, 2, 6])
+
+    @synchronous
+    async def test_concurrency(self):
+        start = time.monotonic()
+        doubled = await collect(aio.map(range(0, 10), slow_double, limit=10))
+        self.assertEqual(doubled, [x * 2 for x in range(0, 10)])
+        self.assertLess(time.monotonic() - start, 0.3)
+
+    @synchronous
+    async def test_unordered(self):
+        async def delayed(x):
+            await asyncio.sleep(x / 100.0)
+            return x
+        self.assertEqual(await collect(aio.map([5, 1, 3], delayed, limit=3, ordered=False)), [1, 3, 5])
+
+    @synchronous
+    async def test_batches(self):
+        async def double(batch):
+            await asyncio.sleep(0)
+            return [x * 2 for x in batch]
+        self.assertEqual(await collect(aio.map_batches(agen(range(7)), double, batch_size=3, limit=2)), [0, 2, 4, 6, 8, 10, 12])
+
+
+class TestAioFilters(unittest.TestCase):
+
+    @synchronous
+    async def test_select_reject(self):
+        async def is_even(x):
+            return x % 2 == 0
+        self.assertEqual(await collect(aio.select(agen(range(0, 6)), is_even, limit=2)), [0, 2, 4])
+        self.assertEqual(await collect(aio.reject(agen(range(0, 6)), is_even)), [1, 3, 5])
+
+    @synchronous
+    async def test_find(self):
+        self.assertEqual(await collect(aio.find(agen([1, 4, 6]), lambda x: x % 2 == 0)), [4])
+
+    @synchronous
+    async def test_where_pluck(self):
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}]
+        self.assertEqual(await collect(aio.pluck(aio.where(agen(stooges), {"age": 50}), 'name')), ['larry'])
+        self.assertEqual(await collect(aio.pluck(agen([{"a": [{"b": 1}, {"b": 2}]}]), 'a.*.b')), [1, 2])
+        self.assertEqual(await collect(aio.pluck(aio.reject(agen(stooges), {"age": {"$gt": 45}}), 'name')), ['moe'])
+
+    @synchronous
+    async def test_partition(self):
+        evens, odds = aio.partition(agen(range(0, 7)), lambda x: x % 2 == 0)
+        self.assertEqual(await collect(odds), [1, 3, 5])
+        self.assertEqual(await collect(evens), [0, 2, 4, 6])
+
+
+class TestAioAggregates(unittest.TestCase):
+
+    @synchronous
+    async def test_reduce(self):
+        async def add(memo, value):
+            return memo + value
+        self.assertEqual(await aio.reduce(agen([1, 2, 3]), add, 0), 6)
+        self.assertEqual(await aio.reduce(agen([1, 2, 3]), add), 6)
+
+    @synchronous
+    async def test_group_and_count(self):
+        words = ['one', 'two', 'three', 'four']
+        self.assertEqual(await aio.group_by(agen(words), len), {3: ['one', 'two'], 5: ['three'], 4: ['four']})
+        self.assertEqual(await aio.count_by(agen(words), len), {3: 2, 5: 1, 4: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,6 +48,32 @@ class TestFlatten(unittest.TestCase):
         self.assertEqual(flat, [0,1,2,0,1,2,0,1,4,0,1,4])
         print(flat)
 
+    def test_atomic_values(self):
+        l = ["ab", [b"cd", {"e": 1}], [["fg"]]]
+        self.assertEqual(list(_.flatten(l)), ["ab", b"cd", {"e": 1}, "fg"])
+        self.assertEqual(list(_.flatten("ab")), ["ab"])
+
+    def test_depth(self):
+        l = [1, [2], [3, [4, [5]]]]
+        self.assertEqual(list(_.flatten(l, shallow=True)), [1, 2, 3, [4, [5]]])
+        self.assertEqual(list(_.flatten(l, depth=2)), [1, 2, 3, 4, [5]])
+        self.assertEqual(list(_.flatten(l, depth=0)), l)
+
+    def test_deeper_than_recursion_limit(self):
+        import sys
+        l = [0]
+        for i in range(1, sys.getrecursionlimit() + 100):
+            l = [l, i]
+        flat = list(_.flatten(l))
+        self.assertEqual(flat, list(range(0, sys.getrecursionlimit() + 100)))
+
+    def test_type_error_while_iterating(self):
+        def broken():
+            yield 1
+            raise TypeError("raised by the iterable")
+        with self.assertRaises(TypeError):
+            list(_.flatten([broken()]))
+
 
 
 
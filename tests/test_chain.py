@@ -0,0 +1,111 @@
+import unittest
+import underscore as _
+
+
+class TestChain(unittest.TestCase):
+
+    def test_fused_pipeline(self):
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
+        names = _.chain(stooges).select(lambda x: x['age'] > 45).pluck('name').map(str.upper)
+        self.assertListEqual(list(names), ['LARRY', 'CURLY'])
+
+    def test_matches_nested_calls(self):
+        l = range(0, 50)
+        nested = _.reject(_.map(_.select(l, lambda x: x % 3), lambda x: x * 2), lambda x: x % 4 == 0)
+        fused = _.chain(l).select(lambda x: x % 3).map(lambda x: x * 2).reject(lambda x: x % 4 == 0)
+        self.assertListEqual(list(fused), list(nested))
+
+    def test_index_iteratees(self):
+        l = [10, 20, 30, 40]
+        fused = _.chain(l).select(lambda x, i: i % 2 == 0).map(lambda x, i: x + i)
+        self.assertListEqual(list(fused), [10, 31])
+
+    def test_first_stops_pulling(self):
+        pulled = []
+        source = _.each(range(0, 1000), lambda x: pulled.append(x))
+        result = _.chain(source).map(lambda x: x * 3).select(lambda x: x % 2 == 0).first(3)
+        self.assertListEqual(list(result), [0, 6, 12])
+        self.assertEqual(len(pulled), 5)
+
+    def test_lazy_until_iterated(self):
+        pulled = []
+        result = _.chain(_.each([3, 1, 2], lambda x: pulled.append(x))).map(lambda x: -x).sort_by(key_func=abs)
+        self.assertListEqual(pulled, [])
+        self.assertListEqual(list(result), [-1, -2, -3])
+
+    def test_terminal_methods(self):
+        c = _.chain(range(1, 6)).map(lambda x: x * 2)
+        self.assertEqual(c.reduce(lambda m, v: m + v, 0), 30)
+        self.assertEqual(c.reduce_right(lambda m, v: m + str(v), ''), '108642')
+        self.assertEqual(list(_.chain(['a b', 'c']).invoke('split').invoke('len')), [2, 1])
+        self.assertIn(8, c.membership())
+        self.assertEqual(c.size(), 5)
+        self.assertTrue(c.every(lambda x: x % 2 == 0))
+        self.assertEqual(list(c.find(lambda x: x > 5)), [6])
+        self.assertEqual(list(_.chain([{"a": [{"b": 1}, {"b": 2}]}]).pluck('a.*.b').map(lambda x: x * 10)), [10, 20])
+        self.assertEqual(list(c.flat_map(lambda x: [x, -x]).first(3)), [2, -2, 4])
+        self.assertEqual(list(c.map_batches(lambda batch: [sum(batch)] * len(batch), batch_size=3)), [12, 12, 12, 18, 18])
+        small, large = c.partition_by(lambda x: x > 5, [False, True])
+        self.assertEqual((list(small), list(large)), ([2, 4], [6, 8, 10]))
+
+
+class TestChainPlanner(unittest.TestCase):
+
+    def test_where_runs_before_preserving_map(self):
+        calls = []
+        def enrich(record):
+            calls.append(record)
+            return dict(record, score=record['age'] * 2)
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
+        result = _.chain(stooges).map(enrich, preserves=['name', 'age']).where({"name": 'larry'})
+        self.assertListEqual(list(result), [{"name": 'larry', "age": 50, "score": 100}])
+        self.assertEqual(len(calls), 1)
+
+    def test_query_filters_read_their_fields(self):
+        calls = []
+        def enrich(record):
+            calls.append(record)
+            return dict(record, score=record['age'] * 2)
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
+        result = _.chain(stooges).map(enrich, preserves=['name', 'age']).reject({"age": {"$lt": 55}})
+        self.assertListEqual(list(result), [{"name": 'curly', "age": 60, "score": 120}])
+        self.assertEqual(len(calls), 1)
+
+    def test_select_without_reads_is_not_moved(self):
+        calls = []
+        result = _.chain(range(0, 10)).map(lambda x: calls.append(x) or x * 2, preserves=[]).select(lambda x: x > 15)
+        self.assertListEqual(list(result), [16, 18])
+        self.assertEqual(len(calls), 10)
+
+    def test_filter_on_truthiness(self):
+        self.assertListEqual(list(_.chain([0, 1, 2]).select(None)), [1, 2])
+        self.assertListEqual(list(_.chain([0, 1, 2]).reject(None)), [0])
+        self.assertListEqual(list(_.chain([0, 1, 2]).map(lambda x: x - 1).reject()), [0])
+
+    def test_sort_then_first_is_partial_sort(self):
+        l = [5, 3, 9, 1, 7, 3]
+        self.assertListEqual(list(_.chain(l).sort_by(key_func=lambda x: x).first(3)), [1, 3, 3])
+        self.assertListEqual(list(_.chain(l).sort_by(key_func=lambda x: x, reverse=True).map(str).first(2)), ['9', '7'])
+        self.assertListEqual(list(_.chain(l).sort_by(memory_limit=2).map(str)), [str(x) for x in sorted(l)])
+        scores = [{"team": "b", "score": 3}, {"team": "a", "score": 1}, {"team": "b", "score": 5}]
+        from collections import namedtuple
+        Stooge = namedtuple('Stooge', 'name age')
+        self.assertListEqual(list(_.chain([Stooge('moe', 40)]).pluck('name')), ['moe'])
+        ranked = _.chain(scores).sort_by(key=['team', '-score']).pluck('score')
+        self.assertListEqual(list(ranked.first(2)), [1, 5])
+        self.assertListEqual(list(ranked), [1, 5, 3])
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 40}]
+        youngest = _.chain(stooges).select(lambda x: x['age'] < 60).sort_by(key='age').first(2).pluck('name')
+        self.assertListEqual(list(youngest), ['moe', 'curly'])
+
+    def test_find_stops_pulling(self):
+        pulled = []
+        source = _.each(range(0, 1000), lambda x: pulled.append(x))
+        self.assertListEqual(list(_.chain(source).map(lambda x: x * x).find(lambda x: x > 10)), [16])
+        self.assertEqual(len(pulled), 5)
+        self.assertTrue(_.chain(source).some(lambda x: x > 0))
+        self.assertEqual(len(pulled), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import operator
 import unittest
 from underscore import collection as _
 from types import GeneratorType
@@ -16,6 +17,14 @@ class TestEach(unittest.TestCase):
         # TODO fails following assertion somehow
         # patched_fn.assert_any_call()
 
+    def test_calls_iteratee_before_yielding(self):
+        seen = []
+        ret = _.each([1, 10, 100], lambda v, i: seen.append((v, i)))
+        self.assertEqual(next(ret), 1)
+        self.assertEqual(seen, [(1, 0)])
+        self.assertEqual(list(ret), [10, 100])
+        self.assertEqual(seen, [(1, 0), (10, 1), (100, 2)])
+
 
 class TestMap(unittest.TestCase):
 
@@ -24,6 +33,22 @@ class TestMap(unittest.TestCase):
         triple_l = _.map(l, lambda x: 3*x)
         self.assertEqual(list(triple_l), [3,6,9])
 
+    def test_index_and_key(self):
+        self.assertEqual(list(_.map([5, 6], lambda x, i: x*i)), [0, 6])
+        self.assertEqual(list(_.map({"one": 1, "two": 2}, lambda v, k: k*v)), ["one", "twotwo"])
+
+    def test_any_callable(self):
+        import functools, operator
+        self.assertEqual(list(_.map(["a", "b"], str.upper)), ["A", "B"])
+        self.assertEqual(list(_.map([-1, 2], abs)), [1, 2])
+        self.assertEqual(list(_.map([1, 2], functools.partial(operator.add, 10))), [11, 12])
+        self.assertEqual(list(_.map([[1, 2], [3, 4]], operator.itemgetter(0))), [1, 3])
+        self.assertEqual(list(_.map([1, 2], {1: "a", 2: "b"}.get)), ["a", "b"])
+
+    def test_bad_arity(self):
+        with self.assertRaises(_.IllegalArgumentError):
+            _.map([1, 2], lambda a, b, c: a)
+
 
 class TestReduce(unittest.TestCase):
     
@@ -31,16 +56,90 @@ class TestReduce(unittest.TestCase):
         l = [1, 2, 3]
         total = _.reduce(l, lambda m, v: m+v, 0)
         self.assertEqual(total, 6)
-        # twisted_total = _.reduce(l, lambda m, v, i: m + v*i)
+        twisted_total = _.reduce(l, lambda m, v, i: m + v*i)
+        self.assertEqual(twisted_total, 9)
+        self.assertEqual(_.reduce({"a": 1, "b": 2}, lambda m, v, k: m + k * v, ''), 'abb')
+
+    def test_none_init(self):
+        self.assertEqual(_.reduce([1, 2], lambda m, v: (m, v), None), ((None, 1), 2))
+        self.assertEqual(_.reduce([], operator.add, None), None)
+        with self.assertRaises(TypeError):
+            _.reduce([], operator.add)
+
+    def test_associative(self):
+        words = [str(i) for i in range(0, 50)]
+        for chunksize in (1, 3, 64):
+            self.assertEqual(_.reduce(iter(words), operator.add, associative=True, chunksize=chunksize), ''.join(words))
+        self.assertEqual(_.reduce(words, operator.add, '>', associative=True, chunksize=7), '>' + ''.join(words))
+        self.assertEqual(_.reduce([], operator.add, 0, associative=True), 0)
+        with self.assertRaises(_.IllegalArgumentError):
+            _.reduce(words, lambda m, v, i: m + v, associative=True)
+        with self.assertRaises(_.IllegalArgumentError):
+            _.reduce(words, operator.add, workers=2)
+
+
+class TestMapBatches(unittest.TestCase):
+
+    def test_simple_list(self):
+        batches = []
+        double = lambda batch: batches.append(list(batch)) or [x * 2 for x in batch]
+        self.assertEqual(list(_.map_batches(range(7), double, batch_size=3)), [0, 2, 4, 6, 8, 10, 12])
+        self.assertEqual(batches, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_lazy(self):
+        pulled = []
+        results = _.map_batches(_.each(range(100), lambda x: pulled.append(x)), lambda batch: batch, batch_size=10)
+        self.assertEqual(pulled, [])
+        self.assertEqual(next(results), 0)
+        self.assertEqual(len(pulled), 10)
+
+    def test_wrong_number_of_results(self):
+        with self.assertRaises(ValueError):
+            list(_.map_batches(range(5), lambda batch: batch[:1], batch_size=2))
+        with self.assertRaises(_.IllegalArgumentError):
+            _.map_batches(range(5), list, batch_size=0)
+
+    def test_batched_filters(self):
+        calls = []
+        divisible = lambda batch: calls.append(len(batch)) or [x % 3 == 0 for x in batch]
+        self.assertEqual(list(_.select(range(10), divisible, batch_size=4)), [0, 3, 6, 9])
+        self.assertEqual(list(_.reject(range(10), divisible, batch_size=4)), [1, 2, 4, 5, 7, 8])
+        self.assertEqual(calls, [4, 4, 2, 4, 4, 2])
+
+    def test_batched_each(self):
+        seen = []
+        self.assertEqual(list(_.each(iter(range(5)), seen.append, batch_size=2)), [0, 1, 2, 3, 4])
+        self.assertEqual(seen, [[0, 1], [2, 3], [4]])
+
+
+class TestFlatMap(unittest.TestCase):
+
+    def test_simple_list(self):
+        self.assertEqual(list(_.flat_map([1, 2, 3], lambda x: [x] * x)), [1, 2, 2, 3, 3, 3])
+        self.assertEqual(list(_.flat_map(['a', 'b'], lambda x, i: [x] * i)), ['b'])
 
+    def test_lazy(self):
+        pulled = []
+        flat = _.flat_map(_.each(range(0, 100), lambda x: pulled.append(x)), lambda x: [x, x])
+        self.assertEqual(next(flat), 0)
+        self.assertEqual(next(flat), 0)
+        self.assertEqual(pulled, [0])
 
 
 class TestReduceRight(unittest.TestCase):
 
-    def test_exception_raise(self):
-        l = [1, 2, 3]
-        with self.assertRaises(NotImplementedError) as context:
-            _.reduce_right(l, lambda x:x)
+    def test_simple_list(self):
+        self.assertEqual(_.reduce_right([[0, 1], [2, 3], [4, 5]], lambda memo, val: memo + val, []), [4, 5, 2, 3, 0, 1])
+        self.assertEqual(_.reduce_right('abc', lambda memo, val: memo + val), 'cba')
+        self.assertEqual(_.reduce_right('abc', lambda memo, val, i: memo + val * i, ''), 'ccb')
+
+    def test_generator(self):
+        self.assertEqual(_.reduce_right(iter(range(10)), lambda memo, val: memo + [val], []), list(range(9, -1, -1)))
+        for memory_limit in (1, 3, 100):
+            self.assertEqual(_.reduce_right(iter(range(10)), lambda memo, val: memo + [val], [], memory_limit=memory_limit),
+                             list(range(9, -1, -1)))
+        indexes = _.reduce_right(iter('abcd'), lambda memo, val, i: memo + [i], [], memory_limit=3)
+        self.assertEqual(indexes, [3, 2, 1, 0])
 
 
 class TestFind(unittest.TestCase):
@@ -51,6 +150,9 @@ class TestFind(unittest.TestCase):
         first_divisible_by_10 = _.find(l, condition)
         self.assertEqual(first_divisible_by_10.__next__(), 10)
 
+    def test_no_match(self):
+        self.assertEqual(list(_.find([1, 3], lambda x: x % 2 == 0)), [])
+
 
 class TestSelect(unittest.TestCase):
 
@@ -60,6 +162,9 @@ class TestSelect(unittest.TestCase):
         evens = _.select(l, is_even)
         self.assertEqual(list(evens), [2,4,6])
 
+    def test_index(self):
+        self.assertEqual(list(_.select([5, 6, 7], lambda x, i: i != 1)), [5, 7])
+
 
 class TestWhere(unittest.TestCase):
 
@@ -74,6 +179,21 @@ class TestWhere(unittest.TestCase):
         self.assertEqual(list(_.where(list_of_plays, {"author": "Walter Raleigh"})), [{'author': "Walter Raleigh", "year": 1618, "name": "The Historie of the World"}])
         self.assertEqual(len(list(_.where(list_of_plays, {"author":"Shakespeare", "year":1611}))), 2)
 
+    def test_operators(self):
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
+        self.assertEqual(list(_.pluck(_.where(stooges, {"age": {"$gt": 40, "$lte": 60}}), 'name')), ['larry', 'curly'])
+        self.assertEqual(list(_.pluck(_.where(stooges, {"name": {"$nin": ['moe']}, "age": {"$ne": 50}}), 'name')), ['curly'])
+        self.assertEqual(list(_.pluck(_.reject(stooges, {"name": {"$in": ['moe', 'larry']}}), 'name')), ['curly'])
+        self.assertEqual(list(_.pluck(_.select(stooges, {"age": {"$lt": 50}}), 'name')), ['moe'])
+        with self.assertRaises(_.IllegalArgumentError):
+            _.where(stooges, {"age": {"$between": [1, 2]}})
+
+    def test_objects_and_missing_fields(self):
+        from collections import namedtuple, OrderedDict
+        Stooge = namedtuple('Stooge', 'name age')
+        stooges = [Stooge('moe', 40), OrderedDict(name='larry', age=50), {"name": 'curly'}, {"name": 'shemp', "age": None}]
+        self.assertEqual(list(_.where(stooges, {"age": {"$gte": 40}})), stooges[:2])
+
                          
 class TestFindWhere(unittest.TestCase):
 
@@ -97,6 +217,9 @@ class TestReject(unittest.TestCase):
         not_evens = _.reject(l, is_even)
         self.assertEqual(list(not_evens), [1,3,5])
 
+    def test_index(self):
+        self.assertEqual(list(_.reject([5, 6, 7], lambda x, i: i != 1)), [6])
+
 
 class TestEvery(unittest.TestCase):
     
@@ -111,6 +234,8 @@ class TestSome(unittest.TestCase):
     def test_simple_list(self):
         l = [2, 4, 5]
         self.assertTrue(_.some(l, lambda x: x % 2 == 0))
+        self.assertTrue(_.some([0, 1]))
+        self.assertFalse(_.some(l, lambda x, i: x < i))
 
 class TestContains(unittest.TestCase):
 
@@ -119,6 +244,37 @@ class TestContains(unittest.TestCase):
         self.assertTrue(_.contains(l, 3))
         self.assertFalse(_.contains(l, 3, 4))
 
+    def test_from_index(self):
+        l = [1, 2, 3, 4, 5]
+        self.assertTrue(_.contains(l, 4, 3))
+        self.assertFalse(_.contains(l, 3, 3))
+        self.assertTrue(_.contains(l, 4, -2))
+        self.assertTrue(_.contains(iter(l), 4, 3))
+        self.assertFalse(_.contains(iter(l), 3, 3))
+        self.assertTrue(_.contains('abcd', 'cd', 2))
+        self.assertTrue(_.contains(range(10), 5, 2))
+        self.assertFalse(_.contains(range(10), 1, 2))
+        self.assertTrue(_.contains(range(10), 8, -3))
+        with self.assertRaises(_.IllegalArgumentError):
+            _.contains(iter(l), 4, -2)
+
+
+class TestMembership(unittest.TestCase):
+
+    def test_exact(self):
+        known = _.membership(str(i) for i in range(0, 100))
+        self.assertIsInstance(known, frozenset)
+        self.assertIn('42', known)
+        self.assertNotIn('100', known)
+
+    def test_bloom_filter(self):
+        known = _.membership(iter(range(0, 5000)), expected_n=5000, fp_rate=0.01, seed=3)
+        self.assertEqual(len(known), 5000)
+        self.assertTrue(all(i in known for i in range(0, 5000)))
+        false_positives = sum(i in known for i in range(5000, 25000))
+        self.assertLess(false_positives / 20000.0, 0.02)
+        self.assertAlmostEqual(known.error_rate, 0.01, delta=0.002)
+
 
 class TestInvoke(unittest.TestCase):
 
@@ -127,6 +283,28 @@ class TestInvoke(unittest.TestCase):
         new_l = list(_.invoke(l, 'sorted'))
         self.assertListEqual(new_l, [[1,5,7], [1,2,3]])
 
+    def test_arguments(self):
+        self.assertListEqual(list(_.invoke([[5, 1, 7]], 'sorted', keyword_args={"reverse": True})), [[7, 5, 1]])
+        self.assertListEqual(list(_.invoke(['a', 'b'], 'posixpath.join', ['c'])), ['a/c', 'b/c'])
+        self.assertListEqual(list(_.invoke([{"b": 1, "a": 2}], 'json.dumps', keyword_args={"sort_keys": True})), ['{"a": 2, "b": 1}'])
+        self.assertListEqual(list(_.invoke(['a,b,c'], 'str.split', [','], {"maxsplit": 1})), [['a', 'b,c']])
+
+    def test_methods_and_paths(self):
+        self.assertListEqual(list(_.invoke(['a,b', 'c'], 'split', [','])), [['a', 'b'], ['c']])
+        self.assertListEqual(list(_.invoke(['ab', 'c'], 'str.upper')), ['AB', 'C'])
+        self.assertListEqual(list(_.invoke(['<a>'], 'xml.sax.saxutils.escape')), ['&lt;a&gt;'])
+        self.assertListEqual(list(_.invoke([' a '], 'strip')), ['a'])
+
+    def test_methods_before_builtins(self):
+        self.assertListEqual(list(_.invoke(['{0}!'], 'format', ['x'])), ['x!'])
+        self.assertListEqual(list(_.invoke([1.5, 255], 'hex')), ['0x1.8000000000000p+0', '0xff'])
+        self.assertListEqual(list(_.invoke([[2, 1], 'ba'], 'sorted')), [[1, 2], ['a', 'b']])
+
+    def test_not_evaluated(self):
+        for name in ['__import__("os")', 'len(x)', 'unknown_module.run', 'str.no_such_method', 'math.pi']:
+            with self.assertRaises(_.IllegalArgumentError):
+                _.invoke([1], name)
+
 
 class TestPluck(unittest.TestCase):
 
@@ -134,6 +312,66 @@ class TestPluck(unittest.TestCase):
         stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}];
         self.assertListEqual(list(_.pluck(stooges, 'name')), ["moe", "larry", "curly"])
 
+    def setUp(self):
+        self.articles = [
+            {"title": "a", "media": [{"meta": [{"url": "a0"}, {"url": "a1"}]}, {"meta": [{"url": "a2"}]}]},
+            {"title": "b", "media": []},
+            {"title": "c", "media": [{"meta": [{"url": "c0"}]}]},
+        ]
+
+    def test_path(self):
+        self.assertListEqual(list(_.pluck(self.articles[:1], 'media.1.meta.0.url')), ["a2"])
+        self.assertListEqual(list(_.pluck(self.articles[:1], 'media.-1.meta.0.url')), ["a2"])
+
+    def test_digit_and_dotted_keys(self):
+        self.assertListEqual(list(_.pluck([{"years": {"2019": 1}}], 'years.2019')), [1])
+        self.assertListEqual(list(_.pluck([{"years": {2019: 2}}], 'years.2019')), [2])
+        self.assertListEqual(list(_.pluck([{"example.com": 1}], 'example.com')), [1])
+        self.assertListEqual(list(_.pluck([{"hosts": {"example.com": 2}}], 'hosts.example\\.com')), [2])
+
+    def test_wildcard(self):
+        self.assertListEqual(list(_.pluck(self.articles, 'media.*.meta.*.url')), ["a0", "a1", "a2", "c0"])
+        self.assertListEqual(list(_.pluck([{"a": {"x": 1, "y": 2}}], 'a.*')), [1, 2])
+
+    def test_several_paths(self):
+        self.assertListEqual(list(_.pluck(iter(self.articles[:1]), ['title', 'media.0.meta.0.url'])), [("a", "a0")])
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}]
+        self.assertListEqual(list(_.pluck(stooges, ['name', 'age'])), [('moe', 40), ('larry', 50)])
+        with self.assertRaises(_.IllegalArgumentError):
+            _.pluck(self.articles, ['title', 'media.*'])
+
+    def test_attributes(self):
+        from collections import namedtuple
+        Stooge = namedtuple('Stooge', 'name age')
+        Troupe = namedtuple('Troupe', 'stooges')
+        troupes = [Troupe([Stooge('moe', 40), Stooge('larry', 50)])]
+        self.assertListEqual(list(_.pluck(troupes, 'stooges.*.name')), ['moe', 'larry'])
+        self.assertListEqual(list(_.pluck(troupes[0].stooges, ['name', 'age'])), [('moe', 40), ('larry', 50)])
+        self.assertListEqual(list(_.pluck(troupes, 'stooges.1.age')), [50])
+
+    def test_heterogeneous_values(self):
+        from collections import namedtuple
+        Stooge = namedtuple('Stooge', 'name age')
+        stooges = [{"name": 'moe', "age": 40}, Stooge('larry', 50), {"name": 'curly', "age": 60}]
+        self.assertListEqual(list(_.pluck(stooges, 'name')), ['moe', 'larry', 'curly'])
+        self.assertListEqual(list(_.pluck(iter(stooges[1:]), ['name', 'age'])), [('larry', 50), ('curly', 60)])
+        self.assertListEqual(list(_.pluck([Stooge('moe', {"x": 1}), {"age": {"x": 2}}], 'age.x')), [1, 2])
+        hosts = [{"a.b": 1}, {"a": {"b": 2}}, {"a.b": 3}]
+        self.assertListEqual(list(_.pluck(hosts, 'a.b')), [1, 2, 3])
+        self.assertListEqual(list(_.pluck(hosts[1:], 'a.b')), [2, 3])
+        Troupe = namedtuple('Troupe', 'stooges')
+        troupes = [{"stooges": [{"name": 'moe'}]}, Troupe([Stooge('larry', 50), Stooge('curly', 60)])]
+        self.assertListEqual(list(_.pluck(troupes, 'stooges.*.name')), ['moe', 'larry', 'curly'])
+        with self.assertRaises(KeyError):
+            list(_.pluck([{"name": 'moe'}, {"age": 50}], 'name'))
+
+    def test_lazy(self):
+        pulled = []
+        plucked = _.pluck(_.each(self.articles, lambda x: pulled.append(x)), 'title')
+        self.assertEqual(pulled, [])
+        self.assertEqual(next(plucked), "a")
+        self.assertEqual(len(pulled), 1)
+
 
 class TestMax(unittest.TestCase):
 
@@ -143,6 +381,40 @@ class TestMax(unittest.TestCase):
         self.assertDictEqual(_.max(stooges, key_func=lambda x: x.get('age')), {"name":'curly', "age": 60})
 
 
+class TestMaxHeap(unittest.TestCase):
+
+    def test_without_key(self):
+        self.assertEqual(_.max([3, 9, 2]), 9)
+        self.assertEqual(_.min(iter([3, 9, 2])), 2)
+
+    def test_top_n(self):
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
+        self.assertListEqual(list(_.pluck(_.max(iter(stooges), key='age', n=2), 'name')), ['curly', 'larry'])
+        self.assertListEqual(_.min([5, 1, 4, 1], n=3), [1, 1, 4])
+
+    def test_ties(self):
+        self.assertListEqual(_.max([1, 3, 2, 3], ties=True), [3, 3])
+        self.assertListEqual(_.min(["bb", "a", "c"], key_func=len, ties=True), ["a", "c"])
+
+
+class TestMinMax(unittest.TestCase):
+
+    def test_simple_list(self):
+        self.assertEqual(_.minmax([3, 1, 4, 1, 5]), (1, 5))
+        self.assertEqual(_.minmax(iter([7])), (7, 7))
+        self.assertEqual(_.minmax([2, 8]), (2, 8))
+        with self.assertRaises(ValueError):
+            _.minmax([])
+
+    def test_same_as_min_and_max(self):
+        import random
+        rng = random.Random(0)
+        for length in range(1, 30):
+            l = [(rng.randrange(0, 5), i) for i in range(0, length)]
+            first = lambda x: x[0]
+            self.assertEqual(_.minmax(l, key_func=first), (_.min(l, key_func=first), _.max(l, key_func=first)))
+
+
 class TestMin(unittest.TestCase):
 
     def test_simple_list(self):
@@ -161,6 +433,45 @@ class TestSortBy(unittest.TestCase):
         print(s2)
         self.assertListEqual(s2, [{"name": 'curly', "age": 60}, {"name": 'larry', "age": 50}, {"name": 'moe', "age": 40}])
 
+    def test_several_keys(self):
+        players = [{"country": "fr", "score": 3, "id": 0}, {"country": "be", "score": 1, "id": 1},
+                   {"country": "fr", "score": 7, "id": 2}, {"country": "be", "score": 1, "id": 3},
+                   {"country": "fr", "score": 3, "id": 4}]
+        self.assertEqual(list(_.pluck(_.sort_by(players, key=['country', '-score']), 'id')), [1, 3, 2, 0, 4])
+        self.assertEqual(list(_.pluck(_.sort_by(players, key=['country', '-score'], reverse=True), 'id')), [0, 4, 2, 1, 3])
+        self.assertEqual(list(_.pluck(_.sort_by(players, key=['-country', '-score', 'id']), 'id')), [2, 0, 4, 1, 3])
+        with self.assertRaises(_.IllegalArgumentError):
+            _.sort_by(players, key=[])
+
+    def test_argsort(self):
+        words = ['pear', 'fig', 'apple', 'kiwi']
+        self.assertEqual(_.sort_by(words, argsort=True), [2, 1, 3, 0])
+        self.assertEqual(_.sort_by(iter(words), key_func=len, argsort=True), [1, 0, 3, 2])
+        self.assertEqual(list(_.sort_by(words, key_func=len, argsort=True, memory_limit=2)), [1, 0, 3, 2])
+
+    def test_tuple_key(self):
+        cells = [{(1, 0): 'b', 1: 'a', 0: 'z'}, {(1, 0): 'a', 1: 'b', 0: 'y'}]
+        self.assertEqual(_.sort_by(cells, key=(1, 0)), cells[::-1])
+        self.assertEqual(list(_.sort_by(cells, key=(1, 0), memory_limit=1)), cells[::-1])
+        self.assertEqual(_.sorted_index(cells[::-1], {(1, 0): 'ab'}, key=(1, 0)), 1)
+
+
+class TestSortedIndex(unittest.TestCase):
+
+    def test_simple_list(self):
+        self.assertEqual(_.sorted_index([10, 20, 30, 40, 50], 35), 3)
+        self.assertEqual(_.sorted_index([10, 20, 30, 30, 50], 30), 2)
+        self.assertEqual(_.sorted_index([], 30), 0)
+        self.assertEqual(_.sorted_index([50, 40, 30], 45, reverse=True), 1)
+
+    def test_keys(self):
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'curly', "age": 60}]
+        self.assertEqual(_.sorted_index(stooges, {"name": 'larry', "age": 50}, key='age'), 1)
+        self.assertEqual(_.sorted_index(['fig', 'kiwi', 'apple'], 'pear', key_func=len), 1)
+        players = [{"country": "be", "score": s} for s in (9, 4, 1)] + [{"country": "fr", "score": s} for s in (8, 2)]
+        self.assertEqual(_.sorted_index(players, {"country": "fr", "score": 5}, key=['country', '-score']), 4)
+        self.assertEqual(_.sorted_index(players, {"country": "be", "score": 5}, key=['country', '-score']), 1)
+
 
 class TestGroupBy(unittest.TestCase):
 
@@ -170,6 +481,19 @@ class TestGroupBy(unittest.TestCase):
         integer_grouped_l = _.group_by(l, lambda x:math.floor(x))
         self.assertDictEqual(integer_grouped_l, {1: [1.3], 2: [2.1, 2.04]})
 
+    def test_unsorted(self):
+        l = [2.1, 1.3, 2.04, 1.9]
+        self.assertDictEqual(_.group_by(l, int), {2: [2.1, 2.04], 1: [1.3, 1.9]})
+        self.assertDictEqual(_.group_by(iter(l), int, aggregate=len), {2: 2, 1: 2})
+
+    def test_key_name(self):
+        stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 40}]
+        self.assertDictEqual(_.group_by(stooges, 'age', aggregate=len), {40: 2, 50: 1})
+
+    def test_sorted_input(self):
+        groups = _.group_by(iter([1, 1, 2, 3, 3, 3]), lambda x: x, sorted_input=True, aggregate=sum)
+        self.assertListEqual(list(groups), [(1, 2), (2, 2), (3, 9)])
+
 
 class TestIndexBy(unittest.TestCase):
     
@@ -206,6 +530,12 @@ class TestCountBy(unittest.TestCase):
         even_odd_counts = _.count_by(l, is_even_or_odd)
         self.assertDictEqual(even_odd_counts, {'even': 2, 'odd': 3})
 
+    def test_iteratee_called_once(self):
+        calls = []
+        counts = _.count_by([1, 2, 3], lambda x: calls.append(x) or x % 2)
+        self.assertDictEqual(counts, {1: 2, 0: 1})
+        self.assertEqual(calls, [1, 2, 3])
+
 
 class TestShuffle(unittest.TestCase):
     
@@ -218,9 +548,42 @@ class TestShuffle(unittest.TestCase):
             self.assertNotIn(item, temp)
             temp.append(item)
 
+    def test_seed(self):
+        self.assertEqual(_.shuffle(range(50), seed=4), _.shuffle(range(50), seed=4))
+        self.assertEqual(sorted(_.shuffle(range(50), seed=4)), list(range(50)))
+
+    def test_in_place(self):
+        l = list(range(50))
+        shuffled = _.shuffle(l, in_place=True, seed=4)
+        self.assertIs(shuffled, l)
+        self.assertEqual(l, _.shuffle(range(50), seed=4))
+        with self.assertRaises(_.IllegalArgumentError):
+            _.shuffle((1, 2, 3), in_place=True)
+
+    def test_buffered(self):
+        shuffled = _.shuffle((i for i in range(1000)), buffer_size=10, seed=1)
+        self.assertIsInstance(shuffled, GeneratorType)
+        shuffled = list(shuffled)
+        self.assertEqual(sorted(shuffled), list(range(1000)))
+        self.assertNotEqual(shuffled, list(range(1000)))
+
+    def test_buffered_is_lazy(self):
+        pulled = []
+        shuffled = _.shuffle(_.each(range(1000), lambda x: pulled.append(x)), buffer_size=10)
+        next(shuffled)
+        self.assertEqual(len(pulled), 11)
+
+    def test_buffered_shorter_than_buffer(self):
+        self.assertEqual(sorted(_.shuffle(iter([3, 1, 2]), buffer_size=10)), [1, 2, 3])
+
 
 class TestSample(unittest.TestCase):
 
+    def test_generator_order_is_random(self):
+        orders = set(tuple(_.sample(iter([1, 2, 3, 4]), 3, seed=seed)) for seed in range(0, 500))
+        self.assertEqual(len(orders), 24)
+        self.assertGreater(len(set(tuple(_.sample(iter([1, 2, 3]), 3, seed=seed)) for seed in range(0, 100))), 1)
+
     def test_simple_list(self):
         l = range(1, 7)
         random_sample = _.sample(l, 1)
@@ -233,6 +596,42 @@ class TestSample(unittest.TestCase):
             self.assertIn(i, l)
         self.assertEqual(len(two_random_samples), 2)
 
+    def test_generator(self):
+        random_sample = _.sample((i for i in range(100000)), 5, seed=3)
+        self.assertEqual(len(random_sample), 5)
+        self.assertEqual(len(set(random_sample)), 5)
+        self.assertEqual(random_sample, _.sample(iter(range(100000)), 5, seed=3))
+
+    def test_generator_is_uniform(self):
+        import random
+        rng = random.Random(0)
+        counts = [0] * 10
+        for _i in range(4000):
+            for i in _.sample(iter(range(10)), 3, seed=rng):
+                counts[i] += 1
+        for count in counts:
+            self.assertAlmostEqual(count / 12000.0, 0.1, delta=0.02)
+
+    def test_more_than_available(self):
+        self.assertEqual(sorted(_.sample(iter([1, 2, 3]), 5)), [1, 2, 3])
+        self.assertEqual(sorted(_.sample([1, 2, 3], 5)), [1, 2, 3])
+
+    def test_weighted(self):
+        counts = _.count_by(_.sample(['a', 'b', 'c'], 20000, weights=[6, 3, 1], seed=1), lambda x: x)
+        self.assertAlmostEqual(counts['a'] / 20000.0, 0.6, delta=0.02)
+        self.assertAlmostEqual(counts['b'] / 20000.0, 0.3, delta=0.02)
+        self.assertAlmostEqual(counts['c'] / 20000.0, 0.1, delta=0.02)
+
+    def test_weighted_function(self):
+        self.assertEqual(set(_.sample(range(5), 50, weights=lambda x: x % 2)), {1, 3})
+
+    def test_alias_table_reuse(self):
+        from underscore.sampling import AliasTable
+        table = AliasTable(['x', 'y'], [1, 0])
+        self.assertEqual(table.sample(3, seed=1), ['x', 'x', 'x'])
+        with self.assertRaises(ValueError):
+            AliasTable(['x', 'y'], [0, 0])
+
 
 class TestSize(unittest.TestCase):
 
@@ -250,6 +649,57 @@ class TestPartition(unittest.TestCase):
         self.assertEqual(list(evens), [2,4,6,8])
         self.assertEqual(list(not_evens), [1,3,5,7,9])
 
+    def test_generator_single_pass(self):
+        calls = []
+        evens, odds = _.partition((x for x in range(10)), lambda x: calls.append(x) or x % 2 == 0)
+        self.assertEqual(list(odds), [1, 3, 5, 7, 9])
+        self.assertEqual(list(evens), [0, 2, 4, 6, 8])
+        self.assertEqual(calls, list(range(10)))
+
+    def test_interleaved(self):
+        evens, odds = _.partition(iter(range(10)), lambda x: x % 2 == 0)
+        self.assertEqual([next(evens), next(odds), next(odds), next(evens)], [0, 1, 3, 2])
+
+    def test_index(self):
+        first, rest = _.partition(['a', 'b', 'c'], lambda x, i: i == 0)
+        self.assertEqual((list(first), list(rest)), (['a'], ['b', 'c']))
+
+    def test_max_buffer(self):
+        evens, odds = _.partition(iter(range(100)), lambda x: x % 2 == 0, max_buffer=10)
+        with self.assertRaises(BufferError):
+            list(evens)
+
+    def test_closed_side_is_not_buffered(self):
+        evens, odds = _.partition(iter(range(100)), lambda x: x % 2 == 0, max_buffer=10)
+        del odds
+        self.assertEqual(list(evens), list(range(0, 100, 2)))
+
+    def test_spill(self):
+        evens, odds = _.partition(iter(range(1000)), lambda x: x % 2 == 0, max_buffer=10, spill=True)
+        self.assertEqual(list(evens), list(range(0, 1000, 2)))
+        self.assertEqual(list(odds), list(range(1, 1000, 2)))
+        with self.assertRaises(_.IllegalArgumentError):
+            _.partition([1], bool, spill=True)
+
+
+class TestPartitionBy(unittest.TestCase):
+
+    def test_number_of_buckets(self):
+        shards = _.partition_by(iter(range(10)), lambda x: x, 3)
+        self.assertEqual([list(shard) for shard in reversed(shards)], [[2, 5, 8], [1, 4, 7], [0, 3, 6, 9]])
+
+    def test_keys(self):
+        stores = [{'country': 'US', 'id': 1}, {'country': 'DE', 'id': 2}, {'country': 'US', 'id': 3}]
+        us, de = _.partition_by(stores, 'country', ['US', 'DE'])
+        self.assertEqual(list(_.pluck(de, 'id')), [2])
+        self.assertEqual(list(_.pluck(us, 'id')), [1, 3])
+
+    def test_unknown_key(self):
+        us, de = _.partition_by(['US', 'FR'], lambda x: x, ['US', 'DE'])
+        self.assertEqual(next(us), 'US')
+        with self.assertRaises(KeyError):
+            next(us)
+
 
 
 if __name__ == "__main__":
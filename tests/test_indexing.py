@@ -0,0 +1,70 @@
+import unittest
+import underscore as _
+from underscore import collection
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.plays = [
+            {"title": "Cymbeline", "author": "Shakespeare", "year": 1611},
+            {"title": "The Alchemist", "author": "Jonson", "year": 1610},
+            {"title": "The Tempest", "author": "Shakespeare", "year": 1611},
+            {"title": "Hamlet", "author": "Shakespeare", "year": 1601, "tags": ["tragedy"]},
+        ]
+        self.index = _.index(self.plays, fields=['author', 'year'])
+
+    def assertSameAsWhere(self, properties):
+        self.assertEqual(self.index.where(properties), list(collection.where(self.plays, properties)))
+
+    def test_indexed_fields(self):
+        self.assertEqual(list(_.pluck(self.index.where({"author": "Shakespeare", "year": 1611}), 'title')),
+                         ["Cymbeline", "The Tempest"])
+        self.assertSameAsWhere({"author": "Shakespeare", "year": 1611})
+        self.assertSameAsWhere({"author": "Shakespeare"})
+        self.assertSameAsWhere({"author": "Marlowe"})
+
+    def test_unindexed_fields(self):
+        self.assertSameAsWhere({"author": "Shakespeare", "title": "Hamlet"})
+        self.assertSameAsWhere({"title": "The Alchemist"})
+        self.assertSameAsWhere({"tags": ["tragedy"]})
+        self.assertSameAsWhere({})
+
+    def test_find_where(self):
+        self.assertEqual(list(self.index.find_where({"year": 1611})), [self.plays[0]])
+        self.assertEqual(list(self.index.find_where({"year": 1500})), [])
+
+    def test_add_remove(self):
+        play = {"title": "Pericles", "author": "Shakespeare", "year": 1608}
+        self.index.add(play)
+        self.assertIn(play, self.index)
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.where({"year": 1608}), [play])
+        self.index.remove({"title": "Cymbeline", "author": "Shakespeare", "year": 1611})
+        self.assertEqual(self.index.where({"year": 1611}), [self.plays[2]])
+        self.assertEqual(list(self.index), self.plays[1:] + [play])
+        with self.assertRaises(ValueError):
+            self.index.remove(self.plays[0])
+
+    def test_operators(self):
+        self.assertSameAsWhere({"author": {"$in": ["Jonson", "Marlowe"]}})
+        self.assertSameAsWhere({"author": {"$in": ["Shakespeare"]}, "year": {"$gt": 1605}})
+        self.assertSameAsWhere({"author": {"$ne": "Shakespeare"}})
+        self.assertSameAsWhere({"year": {"$gte": 1610, "$lt": 1611}, "title": {"$nin": ["Hamlet"]}})
+
+    def test_objects(self):
+        from collections import namedtuple
+        Play = namedtuple('Play', 'title author year')
+        plays = [Play(play['title'], play['author'], play['year']) for play in self.plays]
+        index = _.index(plays, fields=['author'])
+        self.assertEqual(index.where({"author": "Shakespeare", "year": 1611}), [plays[0], plays[2]])
+        index.remove(plays[1])
+        self.assertEqual(index.where({"author": "Jonson"}), [])
+
+    def test_chain(self):
+        index = _.chain(self.plays).select(lambda play: play['year'] > 1605).index(['author'])
+        self.assertEqual(len(index.where({"author": "Shakespeare"})), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
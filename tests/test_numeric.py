@@ -0,0 +1,99 @@
+import functools
+import math
+import operator
+import unittest
+from underscore import collection as _
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from underscore import numeric
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class TestNumeric(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [5, -3, 8, 0, 8, -7, 2, 5, 11, -3]
+        self.floats = [0.1, 0.2, 0.3, -1.5, 2.25, 0.1]
+
+    def assertSameValues(self, vectorized, pure):
+        self.assertEqual(list(vectorized), list(pure))
+
+    def test_map(self):
+        array = numpy.array(self.values)
+        self.assertSameValues(numeric.map(array, lambda x: x * 3 + 1), _.map(self.values, lambda x: x * 3 + 1))
+        # math.sqrt does not work on arrays, falls back to python
+        self.assertSameValues(numeric.map(numpy.abs(array), math.sqrt), _.map(map(abs, self.values), math.sqrt))
+        with self.assertRaises(ZeroDivisionError):
+            numeric.map(array, lambda x: 1 // x)
+
+    def test_select_reject_partition(self):
+        is_even = lambda x: x % 2 == 0
+        self.assertSameValues(numeric.select(self.values, is_even), _.select(self.values, is_even))
+        self.assertSameValues(numeric.reject(self.values, is_even), _.reject(self.values, is_even))
+        evens, odds = numeric.partition(numpy.array(self.values), is_even)
+        self.assertEqual((list(evens), list(odds)), tuple(list(side) for side in _.partition(self.values, is_even)))
+        # if/else can not be vectorized
+        positive = lambda x: True if x > 0 else False
+        self.assertSameValues(numeric.select(self.values, positive), _.select(self.values, positive))
+
+    def test_not_numeric(self):
+        words = ['b', 'a', 'c']
+        self.assertSameValues(numeric.select(words, lambda x: x > 'a'), ['b', 'c'])
+        self.assertSameValues(numeric.sort_by(iter(words)), ['a', 'b', 'c'])
+
+    def test_integer_overflow(self):
+        big = [4000000000, 5000000000, 1]
+        square = lambda x: x * x
+        self.assertSameValues(numeric.select(big, lambda x: x * x > 0), _.select(big, lambda x: x * x > 0))
+        self.assertSameValues(numeric.sort_by(big, square), _.sort_by(big, key_func=square))
+        self.assertSameValues(numeric.map(big, square), _.map(big, square))
+        self.assertEqual(numeric.max(big, key_func=lambda x: -x * x), 1)
+        self.assertEqual(numeric.count_by(big, lambda x: x * x % 7), _.count_by(big, lambda x: x * x % 7))
+
+    def test_booleans(self):
+        flags = [True, False, True]
+        self.assertSameValues(numeric.map(flags, lambda x: x + x), [2, 0, 2])
+        self.assertEqual(numeric.reduce(flags, operator.add), 2)
+
+    def test_reduce(self):
+        self.assertEqual(numeric.reduce(numpy.array(self.values), operator.add), sum(self.values))
+        self.assertEqual(numeric.reduce(self.floats, operator.add), functools.reduce(operator.add, self.floats))
+        self.assertEqual(numeric.reduce(self.values, operator.add, 100), sum(self.values) + 100)
+        self.assertEqual(numeric.reduce(self.values, max), 11)
+        big = [2 ** 40] * 10
+        self.assertEqual(numeric.reduce(big, operator.mul, 1), 2 ** 400)
+        self.assertEqual(numeric.reduce(big, operator.mul), 2 ** 400)
+        self.assertEqual(numeric.reduce(self.values, lambda memo, x: memo - x, 0), _.reduce(self.values, lambda memo, x: memo - x, 0))
+        self.assertEqual(numeric.reduce(self.values, lambda memo, x: memo - x), _.reduce(self.values, lambda memo, x: memo - x))
+        self.assertEqual(numeric.reduce([], operator.add, 0), 0)
+
+    def test_max_min(self):
+        self.assertEqual(numeric.max(self.values), 11)
+        self.assertEqual(numeric.min(numpy.array(self.values)), -7)
+        self.assertEqual(numeric.max(self.values, key_func=lambda x: -abs(x)), _.max(self.values, key_func=lambda x: -abs(x)))
+        self.assertSameValues(numeric.max(self.values, key_func=abs, n=4), _.max(self.values, key_func=abs, n=4))
+        self.assertSameValues(numeric.min(self.values, key_func=abs, n=4), _.min(self.values, key_func=abs, n=4))
+
+    def test_sort_by(self):
+        self.assertSameValues(numeric.sort_by(self.values), sorted(self.values))
+        self.assertSameValues(numeric.sort_by(self.values, abs), sorted(self.values, key=abs))
+        self.assertSameValues(numeric.sort_by(self.values, abs, reverse=True), sorted(self.values, key=abs, reverse=True))
+
+    def test_count_by(self):
+        by_sign = lambda x: numpy.sign(x) if isinstance(x, numpy.ndarray) else (x > 0) - (x < 0)
+        self.assertEqual(list(numeric.count_by(self.values, by_sign).items()), list(_.count_by(self.values, by_sign).items()))
+        self.assertEqual(numeric.count_by(numpy.arange(10), lambda x: x % 3), {0: 4, 1: 3, 2: 3})
+
+    def test_sample(self):
+        self.assertSameValues(numeric.sample(numpy.array(self.values), 4, seed=3), _.sample(self.values, 4, seed=3))
+        self.assertSameValues(numeric.sample(self.values, 4, weights=[1] * 10, seed=3),
+                              _.sample(self.values, 4, weights=[1] * 10, seed=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
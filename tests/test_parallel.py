@@ -0,0 +1,156 @@
+import itertools
+import operator
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.request import urlopen
+from underscore import collection as _
+
+
+def square(x):
+    return x * x
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def weighted(x, i):
+    return x * i
+
+
+def squares(batch):
+    return [x * x for x in batch]
+
+
+class TestParallelMap(unittest.TestCase):
+
+    def test_ordered(self):
+        self.assertEqual(list(_.map(range(0, 100), square, workers=2, chunksize=7)), [x * x for x in range(0, 100)])
+
+    def test_unordered(self):
+        squares = _.map(range(0, 100), square, workers=3, chunksize=5, ordered=False)
+        self.assertEqual(sorted(squares), [x * x for x in range(0, 100)])
+
+    def test_index(self):
+        self.assertEqual(list(_.map([3, 4, 5], weighted, workers=2)), [0, 4, 10])
+
+    def test_unbounded_generator(self):
+        squares = _.map(itertools.count(), square, workers=2, chunksize=10)
+        self.assertEqual(list(itertools.islice(squares, 5)), [0, 1, 4, 9, 16])
+        squares.close()
+
+
+class TestParallelFilters(unittest.TestCase):
+
+    def test_select_reject(self):
+        self.assertEqual(list(_.select(range(0, 20), is_even, workers=2, chunksize=3)), list(range(0, 20, 2)))
+        self.assertEqual(list(_.reject(range(0, 20), is_even, workers=2, chunksize=3)), list(range(1, 20, 2)))
+
+    def test_batches(self):
+        self.assertEqual(list(_.map_batches(range(0, 50), squares, batch_size=8, workers=2)), [x * x for x in range(0, 50)])
+        evens = _.select(range(0, 20), lambda batch: [x % 2 == 0 for x in batch], batch_size=6, workers=2, executor='thread')
+        self.assertEqual(list(evens), list(range(0, 20, 2)))
+
+    def test_associative_reduce(self):
+        total = _.reduce(iter(range(0, 10000)), operator.add, associative=True, workers=2, chunksize=700)
+        self.assertEqual(total, sum(range(0, 10000)))
+        merged = _.reduce(([x] for x in range(0, 100)), operator.add, [], associative=True, workers=2, chunksize=9, executor='thread')
+        self.assertEqual(merged, list(range(0, 100)))
+
+    def test_partition_generator(self):
+        evens, odds = _.partition((x for x in range(0, 10)), is_even, workers=2)
+        self.assertEqual(list(evens), [0, 2, 4, 6, 8])
+        self.assertEqual(list(odds), [1, 3, 5, 7, 9])
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer needs python 3.7
+    daemon_threads = True
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in for a remote API, /<delay in ms>/<payload> answers payload after the delay.
+    """
+
+    def do_GET(self):
+        _, delay, payload = self.path.split('/')
+        time.sleep(int(delay) / 1000.0)
+        body = payload.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestThreadedMap(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = 'http://127.0.0.1:{0}/'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def fetch(self, path):
+        with urlopen(self.base + path) as response:
+            return response.read().decode()
+
+    def test_ordered(self):
+        paths = ['{0}/page{1}'.format(d, i) for i, d in enumerate([300, 10, 10, 10])]
+        pages = _.map(paths, self.fetch, workers=4, executor='thread')
+        self.assertEqual(list(pages), ['page0', 'page1', 'page2', 'page3'])
+
+    def test_as_completed(self):
+        paths = ['{0}/page{1}'.format(d, i) for i, d in enumerate([300, 10, 10, 10])]
+        pages = list(_.map(paths, self.fetch, workers=4, executor='thread', ordered=False))
+        self.assertEqual(pages[-1], 'page0')
+        self.assertEqual(sorted(pages), ['page0', 'page1', 'page2', 'page3'])
+
+    def test_concurrency(self):
+        # one after the other, the calls would take 4 seconds
+        start = time.monotonic()
+        list(_.map(['500/x'] * 8, self.fetch, workers=8, executor='thread'))
+        self.assertLess(time.monotonic() - start, 2.5)
+
+    def test_timeout(self):
+        pages = _.map(['10/fast', '2000/slow'], self.fetch, workers=2, executor='thread', timeout=0.5)
+        self.assertEqual(next(pages), 'fast')
+        with self.assertRaises(TimeoutError):
+            next(pages)
+
+    def test_timeout_counts_from_start(self):
+        # six calls of 250ms queue behind a single worker for 1.5 seconds, each one finishes within its timeout
+        paths = ['250/page{0}'.format(i) for i in range(0, 6)]
+        expected = ['page{0}'.format(i) for i in range(0, 6)]
+        pages = _.map(paths, self.fetch, workers=1, executor='thread', timeout=1.0)
+        self.assertEqual(list(pages), expected)
+        pages = _.map(paths, self.fetch, workers=1, executor='thread', timeout=1.0, ordered=False)
+        self.assertEqual(sorted(pages), expected)
+        # chunks get the timeout of each of their elements
+        pages = _.map(paths, self.fetch, workers=1, chunksize=2, executor='thread', timeout=1.0)
+        self.assertEqual(list(pages), expected)
+
+    def test_bounded_prefetch(self):
+        pulled = []
+        paths = _.each(('10/{0}'.format(i) for i in itertools.count()), lambda p: pulled.append(p))
+        pages = _.each(paths, self.fetch, workers=2, executor='thread', prefetch=3)
+        self.assertEqual(next(pages), '10/0')
+        # inputs are only pulled by the consumer's thread, while submitting chunks, nothing moves until the next value
+        self.assertLessEqual(len(pulled), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
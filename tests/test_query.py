@@ -0,0 +1,57 @@
+import unittest
+from underscore import query
+
+
+class Stooge(object):
+
+    def __init__(self, name, age):
+        self.name = name
+        self.age = age
+
+
+class TestCompile(unittest.TestCase):
+
+    def test_operators(self):
+        cases = [
+            ({"age": 40}, True),
+            ({"age": {"$eq": 40}}, True),
+            ({"age": {"$ne": 40}}, False),
+            ({"age": {"$gt": 40}}, False),
+            ({"age": {"$gte": 40}}, True),
+            ({"age": {"$lt": 41}}, True),
+            ({"age": {"$lte": 39}}, False),
+            ({"age": {"$in": [40, 50]}}, True),
+            ({"age": {"$nin": [40, 50]}}, False),
+            ({"name": {"$in": [["moe"]]}}, False),
+            ({}, True),
+        ]
+        for properties, expected in cases:
+            matches = query.compile(properties)
+            self.assertEqual(matches({"name": "moe", "age": 40}), expected, properties)
+            self.assertEqual(matches(Stooge("moe", 40)), expected, properties)
+
+    def test_shape_is_cached(self):
+        older = query.compile({"age": {"$gt": 40}, "name": "moe"})
+        younger = query.compile({"age": {"$gt": 50}, "name": "moe"})
+        self.assertIs(older.__code__, younger.__code__)
+        self.assertTrue(older({"age": 45, "name": "moe"}))
+        self.assertFalse(younger({"age": 45, "name": "moe"}))
+
+    def test_unusual_fields(self):
+        matches = query.compile({"class": "A", 1: "one", "media-metadata": None})
+        self.assertTrue(matches({"class": "A", 1: "one", "media-metadata": None}))
+        self.assertFalse(matches(Stooge("moe", 40)))
+
+    def test_nested_dictionary_is_a_value(self):
+        matches = query.compile({"address": {"city": "Paris"}})
+        self.assertTrue(matches({"address": {"city": "Paris"}}))
+        self.assertFalse(matches({"address": {"city": "Paris", "zip": "75001"}}))
+
+    def test_picklable(self):
+        import pickle
+        matches = pickle.loads(pickle.dumps(query.Query({"age": {"$gt": 40}})))
+        self.assertTrue(matches({"age": 50}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+from collections import Counter
+from underscore import collection as _
+from underscore import sketch
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def test_error_bound(self):
+        rng = random.Random(1)
+        words = [int(rng.paretovariate(1.2)) for _ in range(0, 20000)]
+        cms = sketch.CountMinSketch(epsilon=0.01, delta=0.01, seed=1)
+        for word in words:
+            cms.add(word)
+        for word, count in Counter(words).items():
+            self.assertGreaterEqual(cms[word], count)
+            self.assertLessEqual(cms[word], count + cms.error_bound)
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_heavy_hitters(self):
+        stream = ['a'] * 500 + ['b'] * 300 + [str(i) for i in range(0, 1000)] + ['c'] * 200
+        random.Random(2).shuffle(stream)
+        top = sketch.SpaceSaving(20)
+        for key in stream:
+            top.add(key)
+        self.assertEqual([key for key, _ in top.most_common(3)], ['a', 'b', 'c'])
+        for key, count in top.most_common(3):
+            self.assertLessEqual(count - top.error(key), stream.count(key))
+            self.assertLessEqual(top.error(key), len(stream) / 20)
+
+
+    def test_mixed_keys(self):
+        counts = _.count_by([1, 'a', None, 1, 'a', (2, 3), None, None], lambda x: x, approximate=True, top_k=2)
+        self.assertEqual(counts.most_common(1), [(None, 3)])
+        top = sketch.SpaceSaving(2)
+        for key in [1, 'a', None, 2.5, 'a']:
+            top.add(key)
+        self.assertIn('a', top)
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        words = ['word{0}'.format(i) for i in range(0, 2000)]
+        bloom = sketch.BloomFilter(expected_n=2000, fp_rate=0.05, seed=1)
+        bloom.update(words)
+        self.assertTrue(all(word in bloom for word in words))
+        self.assertLess(sum('other{0}'.format(i) in bloom for i in range(0, 10000)), 1000)
+        self.assertEqual(len(bloom._bits), (bloom.size + 7) // 8)
+
+    def test_distinct_positions(self):
+        bloom = sketch.BloomFilter(expected_n=1000, fp_rate=0.01, seed=1)
+        # two of the k positions may still meet, as they would for random positions
+        self.assertGreaterEqual(min(len(set(bloom._positions(key))) for key in range(0, 200000)), bloom.hash_count - 1)
+        tiny = sketch.BloomFilter(expected_n=1, fp_rate=0.99)
+        tiny.add('a')
+        self.assertIn('a', tiny)
+
+    def test_size(self):
+        bloom = sketch.BloomFilter(expected_n=1000, fp_rate=0.01)
+        self.assertEqual((bloom.size, bloom.hash_count), (9586, 7))
+        self.assertEqual(bloom.error_rate, 0)
+        with self.assertRaises(ValueError):
+            sketch.BloomFilter(expected_n=1000, fp_rate=1)
+
+
+class TestApproximateCountBy(unittest.TestCase):
+
+    def test_top_k(self):
+        tweets = [{"hashtag": "#python"}] * 50 + [{"hashtag": "#js"}] * 30 + [{"hashtag": str(i)} for i in range(0, 200)]
+        counts = _.count_by(iter(tweets), 'hashtag', approximate=True, top_k=10)
+        self.assertEqual(counts.total, 280)
+        self.assertEqual([key for key, _ in counts.most_common(2)], ['#python', '#js'])
+        self.assertGreaterEqual(counts['#python'], 50)
+        self.assertLessEqual(counts['#python'], 50 + counts.error_bound)
+
+
+if __name__ == "__main__":
+    unittest.main()
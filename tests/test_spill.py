@@ -0,0 +1,139 @@
+import os
+import types
+import unittest
+from underscore import collection as _
+from underscore import spill
+
+
+class TestSpilledGroupBy(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{"user": i % 7, "click": i} for i in range(0, 100)]
+
+    def test_same_groups_as_in_memory(self):
+        spilled = _.group_by(iter(self.records), 'user', memory_limit=10)
+        self.assertIsInstance(spilled, spill.SpilledGroups)
+        expected = _.group_by(self.records, 'user')
+        self.assertEqual(len(spilled), 7)
+        self.assertEqual(sorted(spilled), sorted(expected))
+        for user, clicks in expected.items():
+            self.assertEqual(list(spilled[user]), clicks)
+        self.assertEqual({user: list(group) for user, group in spilled.items()}, expected)
+        with self.assertRaises(KeyError):
+            spilled[8]
+
+    def test_aggregate(self):
+        spilled = _.group_by(self.records, 'user', aggregate=_.size, memory_limit=10)
+        self.assertEqual(spilled[0], 15)
+        self.assertEqual(dict(spilled.items()), _.group_by(self.records, 'user', aggregate=len))
+
+    def test_fits_in_memory(self):
+        self.assertIsInstance(_.group_by(self.records, 'user', memory_limit=1000), dict)
+
+    def test_memory_limit_validated(self):
+        for memory_limit in (0, -1):
+            with self.assertRaises(_.IllegalArgumentError):
+                _.group_by(self.records, 'user', memory_limit=memory_limit)
+            with self.assertRaises(_.IllegalArgumentError):
+                _.index_by(self.records, key='user', memory_limit=memory_limit)
+
+    def test_close_removes_files(self):
+        spilled = _.group_by(self.records, 'user', memory_limit=10)
+        directory = spilled._directory
+        self.assertTrue(os.path.isdir(directory))
+        spilled.close()
+        self.assertFalse(os.path.exists(directory))
+
+
+class TestSpilledIndexBy(unittest.TestCase):
+
+    def test_last_value_wins(self):
+        records = [{"user": i % 30, "click": i} for i in range(0, 100)]
+        spilled = _.index_by(records, key='user', memory_limit=8)
+        self.assertIsInstance(spilled, spill.SpilledIndex)
+        expected = _.index_by(records, key='user')
+        self.assertEqual(len(spilled), 30)
+        self.assertEqual(spilled[3], expected[3])
+        self.assertEqual(dict(spilled.items()), expected)
+
+
+class TestSpillQueue(unittest.TestCase):
+
+    def test_first_in_first_out(self):
+        queue = spill.SpillQueue(3)
+        popped = []
+        for i in range(20):
+            queue.append(i)
+            if i % 3 == 0:
+                popped.append(queue.popleft())
+        self.assertEqual(len(queue), 13)
+        while queue:
+            popped.append(queue.popleft())
+        self.assertEqual(popped, list(range(20)))
+        with self.assertRaises(IndexError):
+            queue.popleft()
+
+    def test_close_removes_files(self):
+        queue = spill.SpillQueue(2)
+        for i in range(10):
+            queue.append(i)
+        directory = queue._directory
+        self.assertTrue(os.path.isdir(directory))
+        queue.close()
+        self.assertFalse(os.path.exists(directory))
+
+
+
+class TestExternalSortBy(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{"score": (i * 37) % 11, "event": i} for i in range(0, 500)]
+
+    def test_same_order_as_sorted(self):
+        for reverse in (False, True):
+            ranked = _.sort_by(iter(self.records), key='score', reverse=reverse, memory_limit=40)
+            self.assertIsInstance(ranked, types.GeneratorType)
+            self.assertEqual(list(ranked), sorted(self.records, key=lambda r: r['score'], reverse=reverse))
+
+    def test_several_merge_passes(self):
+        values = [(i * 7919) % 1000 for i in range(0, 1000)]
+        runs = spill.sort(values, None, False, 5, fan_in=3)
+        self.assertEqual(list(runs), sorted(values))
+
+    def test_fits_in_memory(self):
+        self.assertEqual(_.sort_by([3, 1, 2], memory_limit=10), [1, 2, 3])
+        # exactly memory_limit values fit, one more is merged from disk
+        self.assertEqual(_.sort_by(iter([3, 1, 2]), memory_limit=3), [1, 2, 3])
+        ranked = _.sort_by(iter([3, 1, 4, 2]), memory_limit=3)
+        self.assertIsInstance(ranked, types.GeneratorType)
+        self.assertEqual(list(ranked), [1, 2, 3, 4])
+
+    def test_memory_limit_validated(self):
+        for memory_limit in (0, -1):
+            with self.assertRaises(_.IllegalArgumentError):
+                _.sort_by([3, 1, 2], memory_limit=memory_limit)
+
+    def test_files_removed(self):
+        runs = spill.SortedRuns(key_func=abs, block_size=2)
+        runs.add([1, -2, 3])
+        runs.add([-1, 2])
+        merged = runs.merged()
+        self.assertEqual(next(merged), 1)
+        self.assertTrue(os.path.isdir(runs._directory))
+        merged.close()
+        self.assertFalse(os.path.exists(runs._directory))
+        self.assertEqual(list(spill.sort(range(5, 0, -1), None, False, 2)), [1, 2, 3, 4, 5])
+
+
+
+class TestReverse(unittest.TestCase):
+
+    def test_chunks_read_backwards(self):
+        self.assertEqual(spill.reverse(iter(range(5)), 10), [4, 3, 2, 1, 0])
+        for memory_limit in (1, 2, 5, 7):
+            self.assertEqual(list(spill.reverse(iter(range(20)), memory_limit)), list(range(19, -1, -1)))
+        with self.assertRaises(_.IllegalArgumentError):
+            _.reduce_right(iter([1, 2, 3]), lambda memo, val: memo + [val], [], memory_limit=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,7 +27,6 @@ import json
 import codecs
 import requests
 import underscore as u
-from itertools import chain
 
 URL_MAIN = "http://api.nytimes.com/svc/"
 URL_POPULAR = URL_MAIN + "mostpopular/v2/"
@@ -47,12 +46,9 @@ def article_overview(kind, period):
     ipdb.set_trace()
     titles = []
 
-    # extract urls
-    choose_relevant_medias = lambda media: u.where(media["media-metadata"], {"format": "Standard Thumbnail"})
-    pluck_url_from_chosen_medias = lambda media: u.pluck(choose_relevant_medias(media), 'url')
-    urls = u.map(data, lambda article: u.map(article["media"], pluck_url_from_chosen_medias))
-    # right now urls is a generator of generators, need to flatten it before executing the generator
-    urls = chain(*urls)
+    # extract urls, * fans out over every media of every article, then over every metadata of every media
+    medias = u.pluck(data, 'media.*.media-metadata.*')
+    urls = u.pluck(u.where(medias, {"format": "Standard Thumbnail"}), 'url')
     return (titles, list(urls))
 
 
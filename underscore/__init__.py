@@ -20,17 +20,21 @@ pip install git+https://github.com/ankitml/underscore.git
 
 """
 
-from .collection import (each, map, reduce, reduce_right, find, select,
-                          where, find_where, reject, every, some, contains,
-                          invoke, pluck, max, min, sort_by, group_by, index_by, 
-                          count_by, shuffle, sample, size, partition)
+from .collection import (each, map, map_batches, flat_map, reduce, reduce_right, find, select,
+                          where, find_where, reject, every, some, contains, membership,
+                          invoke, pluck, max, min, minmax, sort_by, sorted_index, group_by, index_by, 
+                          count_by, shuffle, sample, size, partition, partition_by)
 
 from .array import (flatten)
 
+from .chain import (chain)
+
+from .indexing import (index)
+
 __all__ = [
-        'each', 'map', 'reduce', 'reduce_right', 'find', 'select',
-        'where', 'find_where', 'reject', 'every', 'some', 'contains',
-        'invoke', 'pluck', 'max', 'min', 'sort_by', 'group_by', 
-        'index_by', 'count_by', 'shuffle', 'sample', 'size', 'partition',
-        'flatten'
+        'each', 'map', 'map_batches', 'flat_map', 'reduce', 'reduce_right', 'find', 'select',
+        'where', 'find_where', 'reject', 'every', 'some', 'contains', 'membership',
+        'invoke', 'pluck', 'max', 'min', 'minmax', 'sort_by', 'sorted_index', 'group_by', 
+        'index_by', 'count_by', 'shuffle', 'sample', 'size', 'partition', 'partition_by',
+        'flatten', 'chain', 'index'
         ]
@@ -0,0 +1,300 @@
+"""
+asyncio counterparts of the collection functions.
+
+Every function accepts async iterables as well as plain ones, and iteratees which are either
+coroutine functions or plain callables. Functions returning a collection return async generators,
+the ones returning a single value (reduce, group_by, count_by) are coroutines.
+
+Iteratees run concurrently, at most limit of them at once. Only limit elements are pulled ahead
+of the consumer, so a fast source can not fill up memory. With ordered=False results are yielded
+as soon as they are ready instead of in input order.
+
+Examples:
+>>> async def fetch(url):
+...     async with session.get(url) as response:
+...         return await response.json()
+>>> async for page in aio.map(urls, fetch, limit=10):
+...     print(page)
+"""
+import asyncio
+import functools
+import inspect
+from collections import defaultdict, deque
+from collections.abc import Mapping
+from operator import itemgetter
+
+from . import collection
+from . import query
+
+
+def map(iterable, iteratee, limit=1, ordered=True):
+    """
+    Produces a new async stream of values by mapping each value through iteratee, which may be a coroutine function.
+    The iteratee is passed the value, then the index (or key) if it accepts two arguments.
+
+    params: iterable, iteratee, limit [optional], ordered [optional]
+        iterable -> an async iterable, or a list, tuple, iterator, generator, dictionary
+        iteratee -> a coroutine function, function or lambda
+        limit -> maximum number of iteratee calls running at once
+        ordered -> False yields results as soon as they are ready instead of in input order
+
+    Examples:
+    >>> [page async for page in aio.map(urls, fetch, limit=10)]
+    """
+    return _results(_pairs(iterable, iteratee, limit, ordered))
+
+
+async def map_batches(iterable, iteratee, batch_size=64, limit=1, ordered=True):
+    """
+    Like map, but iteratee is called once per list of batch_size values and returns the list of their results, as in collection.map_batches.
+    With limit, up to limit batches are processed at once. With ordered=False the results of a batch are yielded
+    as soon as it is done, still in order within the batch.
+
+    Examples:
+    >>> async for user in aio.map_batches(user_ids, fetch_users_by_ids, batch_size=100, limit=4):
+    ...     print(user)
+    """
+    call = functools.partial(_call_batch, iteratee)
+    async for _, results in _pairs(_batches(iterable, batch_size), call, limit, ordered):
+        for result in results:
+            yield result
+
+
+def each(iterable, iteratee, limit=1, ordered=True):
+    """
+    Passes each value to iteratee, yields the value once its iteratee call has completed.
+
+    params: iterable, iteratee, limit [optional], ordered [optional]
+        iterable -> an async iterable, or a list, tuple, iterator, generator, dictionary
+        iteratee -> a coroutine function, function or lambda
+        limit -> maximum number of iteratee calls running at once
+        ordered -> False yields values as soon as their iteratee is done instead of in input order
+    """
+    return _values(_pairs(iterable, iteratee, limit, ordered))
+
+
+async def select(iterable, conditional, limit=1, ordered=True):
+    """
+    Yields the values passing conditional, which may be a coroutine function.
+
+    params: iterable, conditional, limit [optional], ordered [optional]
+        iterable -> an async iterable, or a list, tuple, iterator, generator, dictionary
+        conditional -> a coroutine function, function or lambda taking the value and optionally the index,
+                       or a query as accepted by collection.where
+        limit -> maximum number of conditional calls running at once
+        ordered -> False yields values as soon as their conditional is done instead of in input order
+    """
+    conditional = collection._predicate(conditional)
+    async for value, result in _pairs(iterable, conditional, limit, ordered):
+        if result:
+            yield value
+
+
+async def reject(iterable, conditional, limit=1, ordered=True):
+    """
+    Yields the values failing conditional, the opposite of select.
+    """
+    conditional = collection._predicate(conditional)
+    async for value, result in _pairs(iterable, conditional, limit, ordered):
+        if not result:
+            yield value
+
+
+async def find(iterable, conditional, limit=1):
+    """
+    Yields the first value passing conditional, calls still running are cancelled once it is found.
+    With limit above 1 the first value is the first in input order among the ones checked, not the first to complete.
+    """
+    pairs = _pairs(iterable, conditional, limit, True)
+    try:
+        async for value, result in pairs:
+            if result:
+                yield value
+                break
+    finally:
+        await pairs.aclose()
+
+
+async def where(iterable, properties):
+    """
+    Yields the values matching properties, a query as accepted by collection.where.
+    """
+    matches = query.compile(properties)
+    async for value in _aiter(iterable):
+        if matches(value):
+            yield value
+
+
+async def pluck(iterable, property_name):
+    """
+    Yields the property named property_name of every dictionary, property_name can be a path or a list of paths as in collection.pluck.
+    """
+    extract = None
+    async for value in _aiter(iterable):
+        if extract is None:
+            extract = collection._plucker(property_name, value)
+        for plucked in extract((value,)):
+            yield plucked
+
+
+async def reduce(iterable, iteratee, init=collection._missing):
+    """
+    Boils down the values into a single one, iteratee(memo, value) may be a coroutine function.
+    Calls are sequential, each one needs the result of the previous one.
+    If init is not passed, the first value is used as the initial memo.
+    """
+    values = _aiter(iterable)
+    memo = init
+    if init is collection._missing:
+        async for memo in values:
+            break
+        else:
+            raise TypeError("reduce() of empty iterable with no initial value")
+    async for value in values:
+        memo = await _call(iteratee, memo, value)
+    return memo
+
+
+async def group_by(iterable, iteratee, limit=1):
+    """
+    Splits the values into lists, grouped by the result of iteratee, which may be a coroutine function or a key name.
+    Returns a dictionary.
+    """
+    groups = defaultdict(list)
+    async for value, key in _pairs(iterable, _key_func(iteratee), limit, True):
+        groups[key].append(value)
+    return dict(groups)
+
+
+async def count_by(iterable, iteratee, limit=1):
+    """
+    Counts the values in every group, grouped by the result of iteratee, which may be a coroutine function or a key name.
+    Returns a dictionary.
+    """
+    counts = defaultdict(int)
+    async for _, key in _pairs(iterable, _key_func(iteratee), limit, True):
+        counts[key] += 1
+    return dict(counts)
+
+
+def partition(iterable, conditional, limit=1):
+    """
+    Splits the values into two async generators, the values passing conditional and the ones failing it.
+    conditional is called once per value. Values are buffered for one side while the other one is consumed.
+    """
+    pairs = _pairs(iterable, conditional, limit, True)
+    buffers = (deque(), deque())
+    lock = asyncio.Lock()
+
+    async def side(buffer):
+        while True:
+            async with lock:
+                if not buffer:
+                    try:
+                        value, result = await pairs.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    buffers[0 if result else 1].append(value)
+                    continue
+                value = buffer.popleft()
+            yield value
+
+    return side(buffers[0]), side(buffers[1])
+
+
+async def _batches(iterable, batch_size):
+    if batch_size < 1:
+        raise collection.IllegalArgumentError("batch_size must be at least 1")
+    batch = []
+    async for value in _aiter(iterable):
+        batch.append(value)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _call_batch(iteratee, batch):
+    results = await _call(iteratee, batch)
+    if len(results) != len(batch):
+        raise ValueError("the batch iteratee returned {0} results for {1} values".format(len(results), len(batch)))
+    return results
+
+
+def _key_func(iteratee):
+    return itemgetter(iteratee) if isinstance(iteratee, str) else iteratee
+
+
+async def _aiter(iterable):
+    if hasattr(iterable, '__aiter__'):
+        async for value in iterable:
+            yield value
+    else:
+        for value in iterable:
+            yield value
+
+
+async def _arguments(iterable, iteratee):
+    # same conventions as collection._arguments, as tuples of arguments
+    if collection._arity(iteratee) == 1:
+        async for value in _aiter(iterable):
+            yield (value,)
+    elif isinstance(iterable, Mapping):
+        for key, value in iterable.items():
+            yield (value, key)
+    else:
+        index = 0
+        async for value in _aiter(iterable):
+            yield (value, index)
+            index += 1
+
+
+async def _call(iteratee, *arguments):
+    result = iteratee(*arguments)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _pairs(iterable, iteratee, limit, ordered):
+    """
+    Yields (value, result) tuples, with at most limit iteratee calls running at once.
+    """
+    pending = deque() if ordered else {}
+    try:
+        async for arguments in _arguments(iterable, iteratee):
+            task = asyncio.ensure_future(_call(iteratee, *arguments))
+            if ordered:
+                pending.append((arguments[0], task))
+                if len(pending) >= limit:
+                    value, task = pending.popleft()
+                    yield value, await task
+            else:
+                pending[task] = arguments[0]
+                if len(pending) >= limit:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield pending.pop(task), task.result()
+        while pending:
+            if ordered:
+                value, task = pending.popleft()
+                yield value, await task
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield pending.pop(task), task.result()
+    finally:
+        tasks = [task for _, task in pending] if ordered else list(pending)
+        for task in tasks:
+            task.cancel()
+
+
+async def _results(pairs):
+    async for _, result in pairs:
+        yield result
+
+
+async def _values(pairs):
+    async for value, _ in pairs:
+        yield value
@@ -1,15 +1,45 @@
-def flatten(iterable, shallow=False):
+from collections.abc import Iterable, Mapping
+
+
+# iterable, but flattened as a single value
+_atomic = (str, bytes, bytearray, Mapping)
+
+
+def flatten(iterable, shallow=False, depth=None):
     """
     Flattens an iterable. (generator, list etc)
     returns a flat generator
+    Nested iterables are walked with an explicit stack, so deep nesting does not hit the recursion limit.
+    Strings, bytes and dictionaries are values, they are not flattened.
+
+    params: iterable, shallow [optional], depth [optional]
+        iterable -> list, sequenece, set, generator etc of values and nested iterables
+        shallow -> only flatten a single level, the same as depth=1
+        depth -> number of levels to flatten, all of them by default
+
+    Examples:
+    >>> list(_.flatten([1, [2], [3, [[4]]]]))
+    >>> [1, 2, 3, 4]
+    >>> list(_.flatten([1, [2], [3, [[4]]]], shallow=True))
+    >>> [1, 2, 3, [[4]]]
+    >>> list(_.flatten(["ab", ["cd"]]))
+    >>> ["ab", "cd"]
     """
     if shallow:
-        raise NotImplementedError
-
-    try:
-        for sublist in iterable:
-            for element in flatten(sublist):
-                yield element
-    except TypeError:
+        depth = 1
+    if not _nested(iterable):
         yield iterable
+        return
+    stack = [iter(iterable)]
+    while stack:
+        for element in stack[-1]:
+            if (depth is None or len(stack) <= depth) and _nested(element):
+                stack.append(iter(element))
+                break
+            yield element
+        else:
+            stack.pop()
+
 
+def _nested(value):
+    return isinstance(value, Iterable) and not isinstance(value, _atomic)
@@ -0,0 +1,323 @@
+"""
+Chaining support, the python counterpart of underscore.js's _.chain
+
+Calling a collection function on the result of another one wraps one generator into
+another, so a pipeline of five functions resumes five generator frames for every element.
+A Chain records the steps instead and, when it is iterated, fuses every run of consecutive
+element-wise steps (each, map, select, reject, where, invoke, find, first) into a
+single loop. The loop is generated once per pipeline shape and cached, the iteratees are
+passed in as arguments.
+
+Before running, the steps are planned:
+* filters (select, reject, where) move ahead of a map when the map declares, through preserves,
+  that it passes every field the filter reads through unchanged, and ahead of sort_by
+* first(n) moves ahead of map and each, a sort_by followed by first(n) becomes a heap based partial sort
+* find, find_where, some and every stop pulling from the source as soon as they are resolved
+
+Examples:
+>>> stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
+>>> list(_.chain(stooges).select(lambda x: x['age'] > 45).pluck('name').map(str.upper))
+>>> ['LARRY', 'CURLY']
+"""
+import heapq
+import itertools
+from collections import namedtuple
+from collections.abc import Mapping
+
+from . import collection
+from . import indexing
+from . import query
+
+
+def chain(iterable):
+    """
+    Returns a wrapped object, calling methods on this object will keep returning wrapped objects until value is called.
+    Element-wise steps are fused into a single loop instead of nesting one generator per step.
+
+    params: iterable
+        iterable -> list, sequenece, set, dictionary, generator etc
+
+    Examples:
+    >>> lyrics = [{"line": 1, "words": "I'm a lumberjack and I'm okay"}, {"line": 2, "words": "I sleep all night and I work all day"}]
+    >>> _.chain(lyrics).pluck('words').map(str.split).size()
+    >>> 2
+    >>> list(_.chain([1, 2, 3, 4]).map(lambda x: x * 3).reject(lambda x: x % 2).value())
+    >>> [6, 12]
+    """
+    return Chain(iterable)
+
+
+class Chain(object):
+    """
+    Lazy pipeline over an iterable. Every method returning a collection returns a new Chain,
+    so a chain can be branched safely. Methods returning a single value (reduce, every, max, size etc)
+    run the pipeline and return that value.
+    """
+
+    def __init__(self, iterable, stages=()):
+        self._iterable = iterable
+        self._stages = tuple(stages)
+
+    def __iter__(self):
+        return self.value()
+
+    def value(self):
+        """
+        Returns an iterator over the result of the pipeline. Nothing is pulled from the source before this iterator is consumed.
+        """
+        iterable = self._iterable
+        segment = []
+        for stage in _plan(self._stages):
+            if stage.kind == 'apply':
+                iterable = _deferred(stage.func, _run(iterable, segment))
+                segment = []
+            else:
+                segment.append(stage)
+        return _run(iterable, segment)
+
+    def _then(self, kind, func, with_index=False, meta=None):
+        return Chain(self._iterable, self._stages + (_Stage(kind, func, with_index, meta),))
+
+    # Element-wise steps, these are fused together
+
+    def each(self, iteratee):
+        return self._then('each', iteratee, _takes_index(iteratee))
+
+    def map(self, iteratee, preserves=None):
+        """
+        preserves -> optional list of fields which iteratee copies unchanged from its input to its output.
+            Filters reading only these fields are run before the iteratee.
+        """
+        return self._then('map', iteratee, _takes_index(iteratee), _fields(preserves))
+
+    def map_batches(self, iteratee, batch_size=64):
+        return self._then('apply', lambda iterable: collection.map_batches(iterable, iteratee, batch_size))
+
+    def flat_map(self, iteratee):
+        return self._then('apply', lambda iterable: collection.flat_map(iterable, iteratee))
+
+    def select(self, conditional, reads=None):
+        """
+        reads -> optional list of the only fields conditional looks at, allows running it before a map preserving them.
+            Queries, as accepted by where, read their own fields.
+        """
+        return self._filter('select', conditional, reads)
+
+    def reject(self, conditional=None, reads=None):
+        return self._filter('reject', conditional, reads)
+
+    def where(self, properties):
+        return self._filter('select', properties)
+
+    def _filter(self, kind, conditional, reads=None):
+        if isinstance(conditional, Mapping):
+            return self._then(kind, query.compile(conditional), meta=_fields(conditional))
+        if conditional is None:
+            conditional = bool
+        return self._then(kind, conditional, _takes_index(conditional), _fields(reads))
+
+    def pluck(self, property_name):
+        """
+        Runs as a separate step, collection.pluck picks item or attribute getters by looking at the first value.
+        """
+        return self._then('apply', lambda iterable: collection.pluck(iterable, property_name))
+
+    def invoke(self, iteratee_name, arguments=None, keyword_args=None):
+        return self._then('map', collection._invoker(iteratee_name, arguments, keyword_args))
+
+    def first(self, n=1):
+        """
+        Keeps only the first n elements. The source is not pulled any further once n elements are through.
+        """
+        return self._then('take', n)
+
+    def find(self, conditional):
+        return self.select(conditional).first()
+
+    def find_where(self, properties):
+        return self.where(properties).first()
+
+    # Steps which need the whole input before yielding
+
+    def sort_by(self, key=None, key_func=None, reverse=False, memory_limit=None):
+        key_func, reverse = collection._sort_key(key, key_func, reverse)
+        return self._then('sort', key_func, meta=(reverse, memory_limit))
+
+    def shuffle(self, buffer_size=None, seed=None):
+        return self._then('apply', lambda iterable: collection.shuffle(iterable, buffer_size=buffer_size, seed=seed))
+
+    def sample(self, n_sample=1, weights=None, seed=None):
+        return self._then('apply', lambda iterable: collection.sample(iterable, n_sample, weights, seed))
+
+    # Terminal steps, these run the pipeline
+
+    def reduce(self, iteratee, init=collection._missing, associative=False, workers=None):
+        return collection.reduce(self.value(), iteratee, init, associative, workers)
+
+    def reduce_right(self, iteratee, init=collection._missing, memory_limit=None):
+        return collection.reduce_right(self.value(), iteratee, init, memory_limit)
+
+    def every(self, conditional=None):
+        return collection.every(self.value(), conditional)
+
+    def some(self, conditional=None):
+        return collection.some(self.value(), conditional)
+
+    def contains(self, value, from_index=None):
+        return collection.contains(self.value(), value, from_index)
+
+    def membership(self, expected_n=None, fp_rate=0.01, seed=None):
+        return collection.membership(self.value(), expected_n, fp_rate, seed)
+
+    def max(self, key=None, key_func=None, n=None, ties=False):
+        return collection.max(self.value(), key, key_func, n, ties)
+
+    def min(self, key=None, key_func=None, n=None, ties=False):
+        return collection.min(self.value(), key, key_func, n, ties)
+
+    def minmax(self, key=None, key_func=None):
+        return collection.minmax(self.value(), key, key_func)
+
+    def group_by(self, iteratee, sorted_input=False, aggregate=None, memory_limit=None):
+        return collection.group_by(self.value(), iteratee, sorted_input, aggregate, memory_limit)
+
+    def index_by(self, key=None, key_func=None, memory_limit=None):
+        return collection.index_by(self.value(), key, key_func, memory_limit)
+
+    def count_by(self, iteratee, approximate=False, top_k=100, epsilon=0.001, delta=0.01):
+        return collection.count_by(self.value(), iteratee, approximate, top_k, epsilon, delta)
+
+    def size(self):
+        return collection.size(self.value())
+
+    def index(self, fields):
+        return indexing.index(self.value(), fields)
+
+    def partition(self, conditional, max_buffer=None, spill=False):
+        return collection.partition(self.value(), conditional, max_buffer=max_buffer, spill=spill)
+
+    def partition_by(self, key_func, buckets, max_buffer=None, spill=False):
+        return collection.partition_by(self.value(), key_func, buckets, max_buffer=max_buffer, spill=spill)
+
+
+_Stage = namedtuple('_Stage', 'kind func with_index meta')
+
+
+def _fields(names):
+    return None if names is None else frozenset(names)
+
+
+def _plan(stages):
+    """
+    Returns an equivalent list of stages which pulls and computes less. Sorts are turned into apply stages.
+    """
+    stages = list(stages)
+    moved = True
+    while moved:
+        moved = False
+        for position in range(1, len(stages)):
+            if _can_run_before(stages[position], stages[position - 1]):
+                stages[position - 1], stages[position] = stages[position], stages[position - 1]
+                moved = True
+    planned = []
+    for stage in stages:
+        if stage.kind == 'take' and planned and planned[-1].kind == 'sort':
+            sort = planned.pop()
+            planned.append(_Stage('apply', _top_n(stage.func, sort.func, sort.meta[0]), False, None))
+        else:
+            planned.append(stage)
+    return [_Stage('apply', _sorter(stage.func, *stage.meta), False, None) if stage.kind == 'sort' else stage
+            for stage in planned]
+
+
+def _can_run_before(stage, previous):
+    if stage.kind in ('select', 'reject') and not stage.with_index:
+        if previous.kind == 'sort':
+            return True
+        return (previous.kind == 'map' and not previous.with_index and
+                stage.meta is not None and previous.meta is not None and stage.meta <= previous.meta)
+    # maps and eaches are one to one, the first n elements stay the same
+    return stage.kind == 'take' and previous.kind in ('map', 'each')
+
+
+def _sorter(key_func, reverse, memory_limit):
+    return lambda iterable: collection.sort_by(iterable, key_func=key_func, reverse=reverse, memory_limit=memory_limit)
+
+
+def _top_n(n, key_func, reverse):
+    # same result as sorted(...)[:n], in O(len * log(n)) with n elements in memory
+    select = heapq.nlargest if reverse else heapq.nsmallest
+    return lambda iterable: select(n, iterable, key=key_func)
+
+
+def _takes_index(func):
+    return collection._arity(func) == 2
+
+
+def _deferred(func, iterable):
+    # keeps steps like sort_by lazy until the chain is iterated
+    yield from func(iterable)
+
+
+def _run(iterable, stages):
+    if not stages:
+        return iter(iterable)
+    if stages[0].with_index:
+        if isinstance(iterable, Mapping):
+            iterable = zip(iterable.values(), iterable.keys())
+        else:
+            iterable = zip(iterable, itertools.count())
+    shape = tuple((stage.kind, stage.with_index) for stage in stages)
+    return _fuse(shape)(iterable, *[stage.func for stage in stages])
+
+
+_fused_loops = {}
+
+
+def _fuse(shape):
+    """
+    Returns a generator function running all the stages of shape in one loop, stages are (kind, with_index) pairs.
+    Filters nest the following stages instead of using continue, so that a take can stop
+    the loop right after its last element has gone through, without pulling one more from the source.
+    """
+    if shape in _fused_loops:
+        return _fused_loops[shape]
+    params = ['_source']
+    prologue = []
+    body = []
+    takes = []
+    depth = 2
+    for position, (kind, with_index) in enumerate(shape):
+        func = 'f%d' % position
+        params.append(func)
+        pad = '    ' * depth
+        if kind == 'take':
+            counter = 'c%d' % position
+            prologue.append('    if %s <= 0:\n        return\n    %s = 0' % (func, counter))
+            body.append('%s%s += 1' % (pad, counter))
+            takes.append('%sif %s >= %s:\n%s    return' % (pad, counter, func, pad))
+            continue
+        index = 'i%d' % position
+        if with_index and position > 0:
+            prologue.append('    %s = -1' % index)
+            body.append('%s%s += 1' % (pad, index))
+        call = '%s(item, %s)' % (func, index) if with_index else '%s(item)' % func
+        if kind == 'map':
+            body.append('%sitem = %s' % (pad, call))
+        elif kind == 'each':
+            body.append(pad + call)
+        elif kind == 'select':
+            body.append('%sif %s:' % (pad, call))
+            depth += 1
+        elif kind == 'reject':
+            body.append('%sif not %s:' % (pad, call))
+            depth += 1
+    body.append('    ' * depth + 'yield item')
+    body.extend(reversed(takes))
+    header = 'for item, i0 in _source:' if shape[0][1] else 'for item in _source:'
+    source = 'def _fused(%s):\n%s\n    %s\n%s\n' % (
+        ', '.join(params), '\n'.join(prologue), header, '\n'.join(body))
+    namespace = {}
+    exec(source, namespace)
+    _fused_loops[shape] = namespace['_fused']
+    return namespace['_fused']
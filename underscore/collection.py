@@ -1,20 +1,104 @@
+import bisect
+import builtins
 import itertools
 import functools
-from types import GeneratorType
+import heapq
+import importlib
+import inspect
+import operator
+import re
+import weakref
+from collections import Counter, deque
+from collections.abc import Mapping, MutableSequence, Sequence
+from types import GeneratorType, ModuleType
 from operator import itemgetter
 
+from . import parallel
+from . import query
+from . import sampling
+from . import sketch
+from . import spill
+
 
-_function_needs_arguments = lambda func, n: func.__code__.co_argcount == n
 _original_map = map
 _original_min = min
 _original_max = max
+_missing = object()
 
 
 class IllegalArgumentError(ValueError):
     pass
 
 
-def each(iterable, iteratee):
+_arities = weakref.WeakKeyDictionary()
+
+
+def _arity(func):
+    """
+    Returns 1 if func is to be called with the value only, 2 if it is to be called with the value and its index (or key).
+    The result is cached for every callable which can be weakly referenced.
+    Builtins and other C callables without an inspectable signature are called with the value only.
+    """
+    try:
+        return _arities[func]
+    except (KeyError, TypeError):
+        pass
+    arity = _inspect_arity(func)
+    try:
+        _arities[func] = arity
+    except TypeError:
+        pass
+    return arity
+
+
+def _inspect_arity(func):
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return 1
+    positional = [p for p in parameters
+                  if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+    required = len([p for p in positional if p.default is inspect.Parameter.empty])
+    takes_more = len(positional) > required or any(p.kind == inspect.Parameter.VAR_POSITIONAL for p in parameters)
+    if required in (1, 2):
+        return required
+    if required == 0 and takes_more:
+        return 1
+    raise IllegalArgumentError("iteratee {0!r} must take either one or two positional arguments".format(func))
+
+
+def _arguments(iterable, iteratee):
+    """
+    Returns the iterables whose elements are to be passed to iteratee, meant for builtins.map(iteratee, *arguments).
+    A two argument iteratee gets the value and the index, or the value and the key for dictionaries.
+    """
+    if _arity(iteratee) == 1:
+        return [iterable]
+    if isinstance(iterable, Mapping):
+        return [iterable.values(), iterable.keys()]
+    return [iterable, itertools.count()]
+
+
+def _parallel_filter(iterable, conditional, keep, *options):
+    results = parallel.pairs(conditional, _arguments(iterable, conditional), *options)
+    kept = filter(itemgetter(1), results) if keep else itertools.filterfalse(itemgetter(1), results)
+    return _original_map(itemgetter(0), kept)
+
+
+def _indexed_filter(iterable, conditional, keep):
+    # index aware conditionals, pairing values with results through tee and compress is slower than this loop
+    if keep:
+        for value, key in zip(*_arguments(iterable, conditional)):
+            if conditional(value, key):
+                yield value
+    else:
+        for value, key in zip(*_arguments(iterable, conditional)):
+            if not conditional(value, key):
+                yield value
+
+
+def each(iterable, iteratee, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None, batch_size=None):
     """
     Iterates over an iterable, yielding each element in turn to an iteratee function. 
 
@@ -22,6 +106,9 @@ def each(iterable, iteratee):
     array: the list whose elements will will be passed on the function one by one. This can be a generator as well yielding elements one by one. 
     function -> a function or lambda that takes either one or two inputs, element of the list, index of element. If it takes only one input then index will not be sent. 
 
+    workers, chunksize, ordered, executor, prefetch, timeout -> optional, run the iteratee in a pool, as in _.map
+    batch_size -> optional, call the iteratee once per list of batch_size elements instead of once per element, as in _.map_batches
+
     Returns a generator of the input iterable, can be used for chaining purposes.
 
     Example: 
@@ -46,44 +133,146 @@ def each(iterable, iteratee):
     >>> 1
     >>> 2
     """
+    if batch_size:
+        batches = _batch_pairs(iterable, iteratee, batch_size, workers, chunksize, ordered, executor, prefetch, timeout)
+        return itertools.chain.from_iterable(_original_map(itemgetter(0), batches))
+    if workers:
+        results = parallel.pairs(iteratee, _arguments(iterable, iteratee), workers, chunksize, ordered,
+                                 executor, prefetch, timeout)
+        return _original_map(itemgetter(0), results)
+    return _each(iterable, iteratee)
+
+
+def _each(iterable, iteratee):
     # list, sets, tuples, generators
-    if _function_needs_arguments(iteratee, 1):
+    # the value itself has to be yielded, a plain loop beats pairing it with the result through zip
+    arguments = _arguments(iterable, iteratee)
+    if len(arguments) == 1:
         for value in iterable:
             iteratee(value)
             yield value
-    if _function_needs_arguments(iteratee, 2):
-        for key,value in enumerate(array):
-            iteratee(value,key)
+    else:
+        for value, key in zip(*arguments):
+            iteratee(value, key)
             yield value
 
 
-def map(iterable, iteratee):
+def map(iterable, iteratee, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None):
     """
     Produces a new stream of values (generator) by mapping each value in array 
     (list, set, tuple, generator) through a transformation function (iteratee). 
     The iteratee is passed two arguments: the value, then the index (or key) of the iteration. If the iteratee can accept only one argument then only one will be sent
 
-    params: array, iteratee
+    params: array, iteratee, workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional]
         array -> a list, tuple, iterator, generator, dictionary
         iteratee -> a function or a lambda
+        workers -> optional number of processes (or threads) to run the iteratee in
+        chunksize -> number of elements sent to a worker at once, only with workers
+        ordered -> with workers, False yields results as soon as they are ready instead of in input order
+        executor -> 'process' for CPU bound iteratees, which must then be picklable (no lambdas), 'thread' for I/O bound ones
+        prefetch -> maximum number of chunks submitted ahead of the consumer, 2 * workers by default
+        timeout -> seconds each element may take once a worker runs it, a chunk gets timeout * its length,
+            then concurrent.futures.TimeoutError is raised
 
     Examples:
     >>> list(_.map([1,2,3], lambda x: x*3))
     >>> [3,6,9]
-    >>> list(_.map({one: 1, two: 2, three: 3}, lambda key, val: val*3))
+    >>> list(_.map({"one": 1, "two": 2, "three": 3}, lambda val, key: val*3))
     >>> [3,6,9]
-    >>> list(_.map([[1, 2], [3, 4]], _.first))
+    >>> list(_.map([[1, 2], [3, 4]], operator.itemgetter(0)))
     >>> [1,3]
+    >>> list(_.map(pages, parse_page, workers=32, chunksize=16))
     """
-    if _function_needs_arguments(iteratee, 1):
-        for item in iterable:
-            yield iteratee(item)
-    if _function_needs_arguments(iteratee, 2):
-        for index, item in enumerate(iterable):
-            yield iteratee(item, index)
+    if workers:
+        return parallel.imap(iteratee, _arguments(iterable, iteratee), workers, chunksize, ordered,
+                             executor, prefetch, timeout)
+    return _original_map(iteratee, *_arguments(iterable, iteratee))
 
 
-def reduce(iterable, iteratee, init=None):
+def map_batches(iterable, iteratee, batch_size=64, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None):
+    """
+    Like map, but iteratee is called once per list of batch_size values and returns the list of their results, in the same order.
+    The stream of results is flattened back lazily, for iteratees which are much cheaper per value on a batch
+    (scoring with a model, database lookups by a list of ids, one compiled regex over many strings).
+    The input is consumed lazily, one batch at a time, the last batch may be shorter.
+
+    params: iterable, iteratee, batch_size [optional], workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional]
+        iterable -> a list, tuple, iterator, generator etc
+        iteratee -> a function taking a list of values and returning a list (or any sequence) of as many results
+        batch_size -> number of values passed to iteratee at once
+        workers, chunksize, ordered, executor, prefetch, timeout -> see map, chunksize counts batches
+
+    Examples:
+    >>> list(_.map_batches(range(5), lambda batch: [x * 2 for x in batch], batch_size=2))
+    >>> [0, 2, 4, 6, 8]
+    >>> scores = _.map_batches(rows, model.predict, batch_size=512)
+    >>> users = _.map_batches(user_ids, fetch_users_by_ids, batch_size=100, workers=8, executor='thread')
+    """
+    call = functools.partial(_call_batch, iteratee)
+    batches = _batches(iterable, batch_size)
+    if workers:
+        results = parallel.imap(call, [batches], workers, chunksize, ordered, executor, prefetch, timeout)
+    else:
+        results = _original_map(call, batches)
+    return itertools.chain.from_iterable(results)
+
+
+def _batches(iterable, batch_size):
+    if batch_size < 1:
+        raise IllegalArgumentError("batch_size must be at least 1")
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, batch_size)), [])
+
+
+def _call_batch(iteratee, batch):
+    # runs in the worker with workers
+    results = iteratee(batch)
+    if len(results) != len(batch):
+        raise ValueError("the batch iteratee returned {0} results for {1} values".format(len(results), len(batch)))
+    return results
+
+
+def _batch_pairs(iterable, call, batch_size, workers, *options):
+    """
+    Returns an iterator of (batch, call(batch)) tuples.
+    """
+    if workers:
+        return parallel.pairs(call, [_batches(iterable, batch_size)], workers, *options)
+    batches, arguments = itertools.tee(_batches(iterable, batch_size))
+    return zip(batches, _original_map(call, arguments))
+
+
+def _rejected(batch, results):
+    return itertools.compress(batch, _original_map(operator.not_, results))
+
+
+def flat_map(iterable, iteratee, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None):
+    """
+    Maps each value through iteratee, which returns an iterable, and yields the elements of these iterables one after the other.
+    Both the input and the iterables returned by iteratee are consumed lazily. Only one level is flattened, see array.flatten for more.
+
+    params: iterable, iteratee, workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional]
+        iterable -> a list, tuple, iterator, generator, dictionary
+        iteratee -> a function or a lambda returning an iterable, called with the value and optionally the index (or key)
+        workers, chunksize, ordered, executor, prefetch, timeout -> see map
+
+    Examples:
+    >>> list(_.flat_map([1, 2, 3], lambda x: [x] * x))
+    >>> [1, 2, 2, 3, 3, 3]
+    >>> urls = _.flat_map(articles, lambda article: _.pluck(article['media'], 'url'))
+    """
+    return itertools.chain.from_iterable(map(iterable, iteratee, workers, chunksize, ordered,
+                                             executor, prefetch, timeout))
+
+
+def reduce(iterable, iteratee, init=_missing, associative=False, workers=None, chunksize=1024, executor='process',
+           prefetch=None, timeout=None):
     """
     Also known as inject, foldl or fold-left, reduce boils down a list of values 
     into a single value. init is the initial state of the reduction, and each 
@@ -92,23 +281,143 @@ def reduce(iterable, iteratee, init=None):
 
     If no init is passed to the initial invocation of reduce, the iteratee is not invoked on the first element of the list. The first element is instead passed as the memo in the invocation of the iteratee on the next element in the list. 
 
-    params: iterable, iteratee, init
+    With associative=True, iteratee(iteratee(a, b), c) has to equal iteratee(a, iteratee(b, c)) (sums, products, max,
+    merging lists, sets or counters). Chunks of chunksize values are then reduced separately, in a pool of workers
+    if workers is given, and their results are combined pairwise in a tree, in order, so iteratee does not have to
+    be commutative. Merges then combine results of similar sizes instead of growing one result value by value.
+
+    params: iterable, iteratee, init, associative [optional], workers [optional], chunksize [optional],
+            executor [optional], prefetch [optional], timeout [optional]
         iterable -> a list, tuple, iterator, generator, dictionary
-        iteratee -> a function or a lambda
+        iteratee -> a function or a lambda, taking the memo and the value, and optionally the index (or key)
         init -> Inital value of the reduced state
+        associative -> True when iteratee is associative, to reduce chunks separately and combine them in a tree
+        workers -> number of processes (or threads) reducing chunks, needs associative
+        chunksize -> number of values reduced in one call
+        executor, prefetch, timeout -> see map
 
     Examples:
     >>> total = _.reduce([1, 2, 3], lambda memo, val: memo + val, 0);
-    # >>> twisted_total = _.reduce([1, 2, 3], lambda memo, val, index: memo + num*index, 0);
+    >>> twisted_total = _.reduce([1, 2, 3], lambda memo, val, index: memo + val * index, 0);
+    >>> 8
+    >>> _.reduce(range(10 ** 8), operator.add, associative=True, workers=4, chunksize=10 ** 6)
+    >>> 4999999950000000
+    """
+    with_index = _reduce_arity(iteratee) == 3
+    if associative:
+        if with_index:
+            raise IllegalArgumentError("associative reductions can not pass the index to iteratee")
+        chunks = _batches(iterable, chunksize)
+        reduce_chunk = functools.partial(functools.reduce, iteratee)
+        if workers:
+            partials = parallel.imap(reduce_chunk, [chunks], workers, 1, True, executor, prefetch, timeout)
+        else:
+            partials = _original_map(reduce_chunk, chunks)
+        memo = _tree_reduce(partials, iteratee)
+        if memo is _missing:
+            if init is _missing:
+                raise TypeError("reduce() of empty iterable with no initial value")
+            return init
+        return memo if init is _missing else iteratee(init, memo)
+    if workers:
+        raise IllegalArgumentError("reduce only runs in parallel with associative=True")
+    if with_index:
+        iterable = zip(iterable.values(), iterable.keys()) if isinstance(iterable, Mapping) else zip(iterable, itertools.count())
+    return _fold(iteratee, iterable, init, with_index)
+
+
+def reduce_right(iterable, iteratee, init=_missing, memory_limit=None):
     """
-    return functools.reduce(iteratee, iterable, init)
+    Reduce right is also known as fold right, it works like reduce from the last value to the first one.
+    Sequences and dictionaries are read backwards with reversed(), other iterables (generators etc) are read to
+    the end first. With memory_limit, they are buffered in chunks of memory_limit values, the chunks beyond the last
+    one are pickled to a temporary file and read back from the last one.
 
+    params: iterable, iteratee, init, memory_limit [optional]
+        iterable -> a list, tuple, iterator, generator, dictionary
+        iteratee -> a function or a lambda, taking the memo and the value, and optionally the index (or key)
+        init -> Inital value of the reduced state, the last value is used if init is not passed
+        memory_limit -> maximum number of values of a generator held in memory
 
-def reduce_right(iterable, iteratee, init=None):
+    Examples:
+    >>> _.reduce_right([[0, 1], [2, 3], [4, 5]], lambda memo, val: memo + val, [])
+    >>> [4, 5, 2, 3, 0, 1]
+    """
+    with_index = _reduce_arity(iteratee) == 3
+    if with_index:
+        if isinstance(iterable, Mapping):
+            backwards = ((iterable[key], key) for key in reversed(list(iterable.keys())))
+        elif isinstance(iterable, Sequence):
+            backwards = zip(reversed(iterable), reversed(range(len(iterable))))
+        else:
+            pairs = enumerate(iterable)
+            pairs = spill.reverse(pairs, memory_limit) if memory_limit is not None else reversed(list(pairs))
+            backwards = _original_map(_swapped, pairs)
+    elif isinstance(iterable, Sequence):
+        backwards = reversed(iterable)
+    elif memory_limit is not None and not isinstance(iterable, Mapping):
+        backwards = spill.reverse(iterable, memory_limit)
+    else:
+        backwards = reversed(list(iterable))
+    return _fold(iteratee, backwards, init, with_index)
+
+
+def _reduce_arity(iteratee):
+    """
+    Returns 3 if iteratee takes the memo, the value and its index (or key), 2 otherwise.
+    """
+    try:
+        parameters = inspect.signature(iteratee).parameters.values()
+    except (TypeError, ValueError):
+        return 2
+    required = [p for p in parameters if p.default is inspect.Parameter.empty and
+                p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+    return 3 if len(required) == 3 else 2
+
+
+def _fold(iteratee, values, init, with_index):
     """
-    Not implemented. Reduce right is also known as fold right. THere is no way this can be implemented with generators and hence skipped.
+    functools.reduce, values being (value, index) pairs for iteratees taking the index.
     """
-    raise NotImplementedError("Reduce right is not compatible with generators and hence is not supported")
+    if with_index:
+        values = iter(values)
+        if init is _missing:
+            first = next(values, _missing)
+            if first is _missing:
+                raise TypeError("reduce() of empty iterable with no initial value")
+            init = first[0]
+        iteratee = functools.partial(_call_with_index, iteratee)
+    if init is _missing:
+        return functools.reduce(iteratee, values)
+    return functools.reduce(iteratee, values, init)
+
+
+def _call_with_index(iteratee, memo, pair):
+    return iteratee(memo, *pair)
+
+
+def _swapped(pair):
+    return pair[1], pair[0]
+
+
+def _tree_reduce(partials, iteratee):
+    """
+    Combines the partial results, in order, as a balanced binary tree built as they arrive.
+    Holds one partial result per level, log2 of their number.
+    """
+    levels = []
+    for count, memo in enumerate(partials, 1):
+        # like a binary counter, every trailing zero bit of count merges the two newest subtrees of equal size
+        while not count & 1:
+            memo = iteratee(levels.pop(), memo)
+            count >>= 1
+        levels.append(memo)
+    if not levels:
+        return _missing
+    memo = levels.pop()
+    while levels:
+        memo = iteratee(levels.pop(), memo)
+    return memo
 
 
 def find(iterable, conditional):
@@ -129,60 +438,89 @@ def find(iterable, conditional):
     >>> next(_.find([1, 2, 3, 4, 5, 6], lambda x: x % 2 == 0))
     >>> 2
 
-    TODO: What happens if nothing is matched, generator would raise an exception on next
+    If nothing is matched the generator is empty, and next raises StopIteration
     """
-    for element in iterable:
-        if conditional(element):
-            yield element
-            break
+    return itertools.islice(select(iterable, conditional), 1)
 
 
-def select(iterable, conditional):
+def select(iterable, conditional, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None, batch_size=None):
     """
      Looks through each value in the list, returning an array of all the values that pass a truth test (conditional). 
 
-    params: conditional, iterable
+    params: conditional, iterable, workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional]
         iterable -> list, sequenece, set, dictionary, generator etc
-        conditional -> a lambda or function that takes one or two inputs, first is element from iterable, second is index (optional)
+        conditional -> a lambda or function that takes one or two inputs, first is element from iterable, second is index (optional),
+                       or a query as accepted by where
+        workers -> optional number of processes (or threads) to run the conditional in
+        chunksize -> number of elements sent to a worker at once, only with workers
+        ordered -> with workers, False yields results as soon as they are ready instead of in input order
+        executor -> 'process' for CPU bound conditionals, which must then be picklable (no lambdas), 'thread' for I/O bound ones
+        prefetch -> maximum number of chunks submitted ahead of the consumer, 2 * workers by default
+        timeout -> seconds each element may take once a worker runs it, a chunk gets timeout * its length,
+            then concurrent.futures.TimeoutError is raised
+        batch_size -> call conditional once per list of batch_size values, returning the list of their truth values, see map_batches
 
     Examples:
 
-    >>> list(_.find([1, 2, 3, 4, 5, 6], lambda x: x % 2 == 0))
+    >>> list(_.select([1, 2, 3, 4, 5, 6], lambda x: x % 2 == 0))
     >>> [2, 4, 6]
+    >>> list(_.select(stooges, {"age": {"$lt": 50}}))
+    >>> [{"name": 'moe', "age": 40}]
     
     """
-    return filter(conditional, iterable)
+    conditional = _predicate(conditional, workers)
+    if batch_size:
+        batches = _batch_pairs(iterable, functools.partial(_call_batch, conditional), batch_size, workers,
+                               chunksize, ordered, executor, prefetch, timeout)
+        return itertools.chain.from_iterable(itertools.starmap(itertools.compress, batches))
+    if workers:
+        return _parallel_filter(iterable, conditional, True, workers, chunksize, ordered,
+                                executor, prefetch, timeout)
+    if _arity(conditional) == 1:
+        return filter(conditional, iterable)
+    return _indexed_filter(iterable, conditional, True)
 
 
 def where(iterable, properties):
     """
      Looks through each value in the list, returning an array of all the values that contain all of the key-value pairs listed in properties. 
+     A property can also be a dictionary of comparison operators: $eq, $ne, $gt, $gte, $lt, $lte, $in and $nin.
+     Values can be dictionaries or any other Mapping, or objects (namedtuples, dataclasses etc) whose attributes are the properties.
+     The query is compiled into a single function, once per combination of properties and operators.
 
      params: iterable, properties
-         iterable-> a list/generator of dictionaries
-         properties-> key value pairs which need to be in a dictionary.
+         iterable-> a list/generator of dictionaries or objects
+         properties-> key value pairs which need to be in a dictionary, or key operators pairs which need to hold.
 
      Examples:
     >>> list(_.where(list_of_plays, {author: "Shakespeare", year: 1611}))
     >>> [{title: "Cymbeline", author: "Shakespeare", year: 1611}, {title: "The Tempest", author: "Shakespeare", year: 1611}]
+    >>> list(_.where(list_of_plays, {author: {"$in": ["Jonson", "Marlowe"]}, year: {"$gte": 1600, "$lt": 1610}}))
+    >>> [{title: "Volpone", author: "Jonson", year: 1606}]
 
     """
-    items_to_be_checked = properties.items()
-    for dictionary in iterable:
-        if not isinstance(dictionary, dict):
-            raise TypeError('"array" should be a collection of dictionaries only')
-        if items_to_be_checked <= dictionary.items():
-            yield dictionary
+    return filter(query.compile(properties), iterable)
+
+
+def _predicate(conditional, workers=None):
+    """
+    Compiles conditional if it is a query, picklable for worker processes when workers is passed.
+    """
+    if isinstance(conditional, Mapping):
+        return query.Query(conditional) if workers else query.compile(conditional)
+    return conditional
 
 
 def find_where(iterable, properties):
     """
      Looks through the list and returns the first value that matches all of the key-value pairs listed in properties. 
-    TODO what happens in case of no match?
+     If nothing is matched the generator is empty.
     
     params: iterable, properties
-         iterable-> a list/generator of dictionaries
-         properties-> key value pairs which need to be in a dictionary.
+         iterable-> a list/generator of dictionaries or objects
+         properties-> key value pairs which need to be in a dictionary, or key operators pairs, see where.
 
     Examples:
     >>> list(_.findWhere(public_service_pulitzers, {"newsroom": "The New York Times"}))
@@ -195,23 +533,46 @@ def find_where(iterable, properties):
     >>>  "newsroom": "The New York Times",
     >>>  "reason": "For its public service in publishing in full so many official reports, documents and speeches by European statesmen relating to the progress and conduct of the war."}
     """
-    yield next(where(iterable, properties))
+    return itertools.islice(where(iterable, properties), 1)
 
 
-def reject(iterable, conditional=None):
+def reject(iterable, conditional=None, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None, batch_size=None):
     """
      Returns the values in list without the elements that the truth test (predicate) passes. The opposite of filter. 
 
-     params: iterable, conditional
+     params: iterable, conditional, workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional]
         iterable -> list, sequenece, set, dictionary, generator etc
-        conditional -> a lambda or function that takes one or two inputs, first is element from iterable, second is index (optional)
+        conditional -> a lambda or function that takes one or two inputs, first is element from iterable, second is index (optional),
+                       or a query as accepted by where
+        workers -> optional number of processes (or threads) to run the conditional in
+        chunksize -> number of elements sent to a worker at once, only with workers
+        ordered -> with workers, False yields results as soon as they are ready instead of in input order
+        executor -> 'process' for CPU bound conditionals, which must then be picklable (no lambdas), 'thread' for I/O bound ones
+        prefetch -> maximum number of chunks submitted ahead of the consumer, 2 * workers by default
+        timeout -> seconds each element may take once a worker runs it, a chunk gets timeout * its length,
+            then concurrent.futures.TimeoutError is raised
+        batch_size -> call conditional once per list of batch_size values, returning the list of their truth values, see map_batches
 
     Examples:
     >>> odds = _.reject([1, 2, 3, 4, 5, 6], lambda x: x % 2 == 0)
     >>> list(odds)
     >>> [1,3,5]
+    >>> list(_.reject(stooges, {"name": {"$in": ["moe", "larry"]}}))
+    >>> [{"name": 'curly', "age": 60}]
     """
-    return itertools.filterfalse(conditional, iterable)
+    conditional = _predicate(conditional, workers)
+    if batch_size:
+        batches = _batch_pairs(iterable, functools.partial(_call_batch, conditional), batch_size, workers,
+                               chunksize, ordered, executor, prefetch, timeout)
+        return itertools.chain.from_iterable(itertools.starmap(_rejected, batches))
+    if workers:
+        return _parallel_filter(iterable, conditional, False, workers, chunksize, ordered,
+                                executor, prefetch, timeout)
+    if conditional is None or _arity(conditional) == 1:
+        return itertools.filterfalse(conditional, iterable)
+    return _indexed_filter(iterable, conditional, False)
 
 
 def every(iterable, conditional=None):
@@ -227,16 +588,7 @@ def every(iterable, conditional=None):
     """
     if conditional is None:
         return all(iterable)
-    if _function_needs_arguments(conditional, 1):
-        for item in iterable:
-            if not conditional(item):
-                return False
-        return True
-    if _function_needs_arguments(conditional, 2):
-        for key, value in enumerate(iterable):
-            if not conditional(value, key):
-                return False
-        return True
+    return all(_original_map(conditional, *_arguments(iterable, conditional)))
 
 
 def some(iterable, conditional=None):
@@ -251,146 +603,499 @@ def some(iterable, conditional=None):
     >>> True
     """
     if conditional is None:
-        return all(iterable)
-    if _function_needs_arguments(conditional, 1):
-        for value in iterable:
-            if conditional(value):
-                return True
-        return False
-    if _function_needs_arguments(conditional, 2):
-        for key, value in enumerate(iterable):
-            if conditional(value, key):
-                return True
-        return False
+        return any(iterable)
+    return any(_original_map(conditional, *_arguments(iterable, conditional)))
 
 
 def contains(iterable, value, from_index=None):
     """
     Returns true if the value is present in the iterable. Use from_index to start your search at a given index.
+    Sequences are searched from from_index with their index method, other iterables are skipped up to it.
+    For repeated lookups in the same values, build a membership set once instead.
 
-    Params: iterable, value
+    Params: iterable, value, from_index [optional]
         iterable -> list, sequenece, set, dictionary, generator etc
         value -> Any element that is to be searched in the iterable
+        from_index -> index of the first element searched, negative indexes count from the end of sequences
 
     IMP: This method is not lazy
 
     Examples:
     >>> _.contains([1, 2, 3], 3);
     >>> True
+    >>> _.contains([1, 2, 3], 1, from_index=1);
+    >>> False
     """
-    if from_index:
-        for index, item in enumerate(iterable):
-            if index > from_index and item == value:
-                return True
-        return False
-    return value in iterable
+    if not from_index:
+        return value in iterable
+    if isinstance(iterable, range):
+        # slicing a range is O(1), and its index method takes no start
+        return value in iterable[from_index:]
+    if isinstance(iterable, Sequence):
+        try:
+            iterable.index(value, from_index)
+        except ValueError:
+            return False
+        except TypeError:
+            # sequences whose index method takes no start
+            if from_index < 0:
+                from_index = _original_max(len(iterable) + from_index, 0)
+            return value in itertools.islice(iterable, from_index, None)
+        return True
+    if from_index < 0:
+        raise IllegalArgumentError("negative from_index needs a sequence, got {0}".format(type(iterable).__name__))
+    return value in itertools.islice(iterable, from_index, None)
+
+
+def membership(iterable, expected_n=None, fp_rate=0.01, seed=None):
+    """
+    Builds a set of the values, for checking many values against the same reference values in O(1).
+    Without expected_n the set is exact, a frozenset. With expected_n it is a Bloom filter (underscore.sketch.BloomFilter)
+    of fixed size, about 1.44 * log2(1 / fp_rate) bits per expected value whatever the size of the values: values added
+    are always found, other values are wrongly found with probability fp_rate, more once more than expected_n were added.
+
+    params: iterable, expected_n [optional], fp_rate [optional], seed [optional]
+        iterable -> list, sequenece, set, dictionary, generator etc
+        expected_n -> number of values expected, to get a Bloom filter
+        fp_rate -> false positive rate of the Bloom filter, 1% by default
+        seed -> seed of the Bloom filter's hash functions
+
+    Examples:
+    >>> known = _.membership(read_reference_ids())
+    >>> 'u42' in known
+    >>> True
+    >>> known = _.membership(read_reference_ids(), expected_n=10 ** 8, fp_rate=0.001)
+    """
+    if expected_n is None:
+        return frozenset(iterable)
+    members = sketch.BloomFilter(expected_n, fp_rate, seed)
+    members.update(iterable)
+    return members
 
 
 def invoke(iterable, iteratee_name, arguments=None, keyword_args=None):
     """
      Calls the callable named by iteratee_name on each value in the iterable. Any extra arguments passed to invoke will be forwarded on to the method invocation. 
+     iteratee_name is a dotted path to a function of a module or a method of a class ('json.dumps', 'str.upper'), or the
+     name of a method of the values themselves ('upper', 'split'), or else a builtin ('sorted'). A method of a value wins
+     over the builtin of the same name ('format', 'hex'). It is resolved once, not evaluated.
 
      Difference with _.each, _.map: each takes in the callable object instead of callable objects' name as string. Also _.invoke returns the new iterable from values returned by the callable. In this sense this is much closer to _.map.
 
-     params: iterable, iteratee_name, arguments [optional]
+     params: iterable, iteratee_name, arguments [optional], keyword_args [optional]
         iterable -> list, sequenece, set, dictionary, generator etc
-        iteratee_name -> name of the function which is available in the score while executing the code
-        arguments -> optional arguments that will be passed on to the iteratee function
+        iteratee_name -> dotted path to a function, name of a method of the values, or name of a builtin
+        arguments -> optional arguments that will be passed on to the iteratee function, after the value
+        keyword_args -> optional keyword arguments that will be passed on to the iteratee function
 
     Examples
     >>> list(_.invoke([[5, 1, 7], [3, 2, 1]], 'sorted'))
     >>> [[1, 5, 7], [1, 2, 3]]
     >>> list(_.invoke([[5, 1, 7], [3, 2, 1]], 'sorted', keyword_args={"reverse":False, "key": lambda x: x if x %2 == 0 else 0}))
     >>>  [[1, 5, 7] [3, 1, 2]]
+    >>> list(_.invoke(['a,b', 'c'], 'split', [',']))
+    >>> [['a', 'b'], ['c']]
+    >>> list(_.invoke([{"a": 1}], 'json.dumps', keyword_args={"sort_keys": True}))
+    >>> ['{"a": 1}']
     """
-    if arguments is None:
-        arguments = []
-    if keyword_args is None:
-        keyword_args = {}
-    # TODO support functions from other modules and classes as well
-    # eval might be risky here, find alternative
-    func = eval(iteratee_name)
-    for item in iterable:
-        yield func(item, *arguments, **keyword_args)
+    func = _resolve(iteratee_name)
+    if func is not None and arguments and not _is_method_name(iteratee_name):
+        # the arguments are repeated alongside the values, so the function is still called by the C level map
+        if keyword_args:
+            func = functools.partial(func, **keyword_args)
+        return _original_map(func, iterable, *[itertools.repeat(argument) for argument in arguments])
+    return _original_map(_invoker(iteratee_name, arguments, keyword_args), iterable)
+
+
+def _invoker(iteratee_name, arguments=None, keyword_args=None):
+    """
+    Returns a single argument callable that calls iteratee_name on an element with the extra arguments.
+    Shared by invoke and chained pipelines.
+    """
+    arguments = arguments or ()
+    keyword_args = keyword_args or {}
+    func = _resolve(iteratee_name)
+    if func is None:
+        return operator.methodcaller(iteratee_name, *arguments, **keyword_args)
+    if _is_method_name(iteratee_name):
+        # decided per value, the builtin is only called on values without a method of that name
+        method = operator.methodcaller(iteratee_name, *arguments, **keyword_args)
+        return lambda item: method(item) if hasattr(item, iteratee_name) else func(item, *arguments, **keyword_args)
+    if arguments:
+        return lambda item: func(item, *arguments, **keyword_args)
+    return functools.partial(func, **keyword_args) if keyword_args else func
+
+
+def _resolve(iteratee_name):
+    if callable(iteratee_name):
+        return iteratee_name
+    if not isinstance(iteratee_name, str) or not all(segment.isidentifier() for segment in iteratee_name.split('.')):
+        raise IllegalArgumentError("invoke takes the name of a function or method, got {0!r}".format(iteratee_name))
+    return _resolve_name(iteratee_name)
+
+
+def _is_method_name(iteratee_name):
+    """
+    True for a single name, which may be the name of a method of the values.
+    """
+    return isinstance(iteratee_name, str) and '.' not in iteratee_name
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_name(name):
+    """
+    Returns the function named by name, a builtin or a dotted path to an attribute of a builtin or a module.
+    None for a single name which is not a callable builtin, it can only be the name of a method of the values.
+    """
+    segments = name.split('.')
+    if len(segments) == 1:
+        func = getattr(builtins, name, None)
+        return func if callable(func) else None
+    if hasattr(builtins, segments[0]):
+        target = getattr(builtins, segments[0])
+    else:
+        target = _import(name, segments[0])
+    for position in range(1, len(segments)):
+        try:
+            target = getattr(target, segments[position])
+        except AttributeError:
+            if not isinstance(target, ModuleType):
+                raise IllegalArgumentError("{0} has no attribute {1}".format('.'.join(segments[:position]), segments[position]))
+            # submodules are attributes of their package once imported
+            target = _import(name, '.'.join(segments[:position + 1]))
+    if not callable(target):
+        raise IllegalArgumentError("{0} is not callable".format(name))
+    return target
+
+
+def _import(name, module_name):
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        raise IllegalArgumentError("can not resolve {0}, there is no module {1}".format(name, module_name))
 
 
 def pluck(iterable, property_name):
     """
      A convenient version of what is perhaps the most common use-case for map: extracting a list of property values from a dictionary like iterable. 
-     TODO: Identify non dictionary like iterables and raise Exception
+     property_name can be a path: segments separated by dots are looked up one after the other, integer segments index lists,
+     and a * segment fans out over all the elements of a list (or values of a dictionary), yielding one value per element.
+     Integer segments are looked up as strings in dictionaries having them as string keys ('years.2019'). Keys containing
+     dots are found as is when the first dictionary has them, or with the dots escaped by a backslash ('hosts.example\\.com').
+     A list of paths yields tuples. Values which are not dictionaries or sequences (namedtuples, dataclasses, objects) have their attributes plucked.
+     Every step is a C level itemgetter / attrgetter, chosen by looking at the first value. Values of another kind
+     (a dictionary after a namedtuple) or with a literal dotted key the first one did not have get their own getters.
 
      params: iterable, property_name
-        iterable-> an iterable of dictionary like objects
-        property_name-> name of property which you want to extract from the dictionaries
+        iterable-> an iterable of dictionary like objects, or of objects
+        property_name-> name of property which you want to extract from the dictionaries, a dotted path, or a list of them
 
     Examples:
     >>> stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}];
     >>> list(_.pluck(stooges, 'name'))
     >>> ["moe", "larry", "curly"]
+    >>> list(_.pluck(stooges, ['name', 'age']))
+    >>> [("moe", 40), ("larry", 50), ("curly", 60)]
+    >>> list(_.pluck(articles, 'media.0.media-metadata.0.url'))
+    >>> list(_.pluck(articles, 'media.*.media-metadata.*.url'))
+    """
+    if iter(iterable) is iterable:
+        return _pluck_lazily(iterable, property_name)
+    return _plucker(property_name, next(iter(iterable), _missing))(iterable)
+
+
+def _pluck_lazily(iterator, property_name):
+    # the first value is needed to choose the getters, it is not pulled before iteration starts
+    for first in iterator:
+        break
+    else:
+        return
+    yield from _plucker(property_name, first)(itertools.chain((first,), iterator))
+
+
+@functools.lru_cache(maxsize=256)
+def _path(property_name):
+    if not isinstance(property_name, str) or '.' not in property_name and property_name != '*':
+        return (property_name,)
+    segments = []
+    # a dot escaped by a backslash is part of the key
+    for segment in re.split(r'(?<!\\)\.', property_name):
+        if not segment:
+            raise IllegalArgumentError("empty segment in path {0!r}".format(property_name))
+        segments.append(segment.replace('\\.', '.'))
+    return tuple(segments)
+
+
+def _sample_path(property_name, sample):
+    # a key containing dots which the first value has is not a path
+    if isinstance(property_name, str) and isinstance(sample, Mapping) and property_name in sample:
+        return (property_name,)
+    return _path(property_name)
+
+
+def _plucker(property_name, sample):
+    """
+    Returns a function turning an iterable into the iterator of its plucked values, sample being its first value.
+    The getters are chosen on sample, a value they do not work on has its own getters chosen.
+    """
+    get, fans = _getter(property_name, sample)
+
+    def extract(iterable):
+        for value in iterable:
+            try:
+                plucked = get(value)
+            except (LookupError, TypeError, AttributeError):
+                # a value of another kind than sample, or with a literal dotted key sample did not have
+                plucked = _getter(property_name, value)[0](value)
+            if fans:
+                yield from plucked
+            else:
+                yield plucked
+    return extract
+
+
+def _getter(property_name, sample):
+    """
+    Returns (get, fans), get plucks property_name from a single value like sample, and returns the list of
+    plucked values when fans is True, for paths with a * segment.
+    """
+    if not isinstance(property_name, list):
+        steps = _steps(_sample_path(property_name, sample), sample)
+        if any(kind == 'fan' for kind, _ in steps):
+            return (lambda value: list(_apply_steps(steps, (value,)))), True
+        return _chained(steps), False
+    plans = [_steps(_sample_path(name, sample), sample) for name in property_name]
+    if any(kind == 'fan' for steps in plans for kind, _ in steps):
+        raise IllegalArgumentError("* can not be used when plucking several paths")
+    if len(plans) > 1 and all(len(steps) == 1 for steps in plans):
+        kinds = set(kind for (kind, _), in plans)
+        if kinds == {'item'}:
+            return itemgetter(*[name for (_, name), in plans]), False
+        if kinds == {'attr'}:
+            return operator.attrgetter(*['.'.join(names) for (_, names), in plans]), False
+    getters = [_chained(steps) for steps in plans]
+    return (lambda value: tuple([get(value) for get in getters])), False
+
+
+def _chained(steps):
+    """
+    Returns the getter following steps, which have no * segment. A single step is a C level itemgetter / attrgetter.
+    """
+    getters = [itemgetter(argument) if kind == 'item' else operator.attrgetter('.'.join(argument))
+               for kind, argument in steps]
+    if len(getters) == 1:
+        return getters[0]
+
+    def get(value):
+        for getter in getters:
+            value = getter(value)
+        return value
+    return get
+
+
+def _steps(path, sample):
+    """
+    Returns the (kind, argument) steps following path, the kind of getter of every step is the one working on sample.
     """
-    return _original_map(itemgetter(property_name), iterable)
+    steps = []
+    value = sample
+    for segment in path:
+        if segment == '*':
+            steps.append(('fan', isinstance(value, Mapping)))
+            value = next(iter(value.values() if isinstance(value, Mapping) else value), _missing) if _iterable(value) else _missing
+            continue
+        if isinstance(segment, str) and segment.lstrip('-').isdigit() and not (isinstance(value, Mapping) and segment in value):
+            segment = int(segment)
+        by_item = (isinstance(segment, int) or value is _missing or isinstance(value, Mapping)
+                   or (hasattr(type(value), '__getitem__') and not isinstance(value, Sequence)))
+        if by_item:
+            steps.append(('item', segment))
+        elif steps and steps[-1][0] == 'attr':
+            # a.b.c is a single attrgetter
+            steps[-1][1].append(segment)
+        else:
+            steps.append(('attr', [segment]))
+        try:
+            value = value[segment] if by_item else getattr(value, segment)
+        except Exception:
+            value = _missing
+    return steps
+
+
+def _iterable(value):
+    try:
+        iter(value)
+    except TypeError:
+        return False
+    return value is not _missing
+
+
+def _apply_steps(steps, stream):
+    for kind, argument in steps:
+        if kind == 'item':
+            stream = _original_map(itemgetter(argument), stream)
+        elif kind == 'attr':
+            stream = _original_map(operator.attrgetter('.'.join(argument)), stream)
+        elif argument:
+            stream = itertools.chain.from_iterable(_original_map(operator.methodcaller('values'), stream))
+        else:
+            stream = itertools.chain.from_iterable(stream)
+    return stream
 
 
-def max(iterable, key=None, key_func=None):
+def max(iterable, key=None, key_func=None, n=None, ties=False):
     """
      Returns the maximum value in list. If a key is provided, it will 
      be used on each value to generate the criterion by which the value is ranked. If a key_func is provided it will be used as callable for every element to rank the items.
      Only one of the key options will be accepted, if both are given key_func will be ignored
+     Without either, values are compared directly.
     
-     params: iterable, key [optional], key_func [optional]
+     params: iterable, key [optional], key_func [optional], n [optional], ties [optional]
         iterable-> an iterable of dictionary like objects
         key-> dictionary key for customizing comparisions in the elements of the iterable
         key_func-> a function or lambda, as custom key function that customizes comparison way
+        n -> return a list of the n largest values instead, in descending order. Uses a heap of n values, O(len * log(n))
+        ties -> True to return the list of all the values sharing the maximum
 
     Examples:
     >>> stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}];
-    >>> next(_.max(stooges, key='age'))
+    >>> _.max(stooges, key='age')
     >>> {"name":'curly', "age": 60}
-    >>> next(_.max(stooges, key_func=lambda x: x.get('age')))
+    >>> _.max(stooges, key_func=lambda x: x.get('age'))
     >>> {"name":'curly', "age": 60}
+    >>> _.max(stooges, key='age', n=2)
+    >>> [{"name":'curly', "age": 60}, {"name": 'larry', "age": 50}]
+    >>> _.max([1, 3, 2, 3], ties=True)
+    >>> [3, 3]
 
     """
-    key_func = itemgetter(key) if key else key_func
-    max_val_tuple = _original_max(enumerate(iterable), key=lambda x: key_func(x[1]))
-    return max_val_tuple[1] 
+    return _extreme(iterable, itemgetter(key) if key else key_func, n, ties, _original_max, heapq.nlargest, operator.gt)
 
 
-def min(iterable, key=None, key_func=None):
+def min(iterable, key=None, key_func=None, n=None, ties=False):
     """
      Returns the minimum value in list. If a key is provided, it will 
      be used on each value to generate the criterion by which the value is ranked. If a key_func is provided it will be used as callable for every element to rank the items.
      Only one of the key options will be accepted, if both are given key_func will be ignored
+     Without either, values are compared directly.
     
-     params: iterable, key [optional], key_func [optional]
+     params: iterable, key [optional], key_func [optional], n [optional], ties [optional]
         iterable-> an iterable of dictionary like objects
         key-> dictionary key for customizing comparisions in the elements of the iterable
         key_func-> a function or lambda, as custom key function that customizes comparison way
+        n -> return a list of the n smallest values instead, in ascending order. Uses a heap of n values, O(len * log(n))
+        ties -> True to return the list of all the values sharing the minimum
 
     Examples:
     >>> stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}];
-    >>> next(_.max(stooges, key='age'))
-    >>> {'moe': 40}
-    >>> next(_.max(stooges, key_func=lambda x: x.get('age')))
-    >>> {'moe': 40}
+    >>> _.min(stooges, key='age')
+    >>> {"name": 'moe', "age": 40}
+    >>> _.min(stooges, key_func=lambda x: x.get('age'))
+    >>> {"name": 'moe', "age": 40}
 
     """
-    key_func = itemgetter(key) if key else key_func
-    min_val_tuple = _original_min(enumerate(iterable), key=lambda x: key_func(x[1]))
-    return min_val_tuple[1] 
+    return _extreme(iterable, itemgetter(key) if key else key_func, n, ties, _original_min, heapq.nsmallest, operator.lt)
+
+
+def _extreme(iterable, key_func, n, ties, builtin, heap_select, better):
+    if n is not None and ties:
+        raise IllegalArgumentError("ties can only be used without n")
+    if n is not None:
+        return heap_select(n, iterable, key=key_func)
+    if not ties:
+        # before python 3.8, max and min do not accept key=None
+        return builtin(iterable) if key_func is None else builtin(iterable, key=key_func)
+    extremes = []
+    for item in iterable:
+        item_key = key_func(item) if key_func else item
+        if not extremes or better(item_key, extreme_key):
+            extremes = [item]
+            extreme_key = item_key
+        elif item_key == extreme_key:
+            extremes.append(item)
+    return extremes
 
 
-def sort_by(iterable, key=None, key_func=None, reverse=False):
+def minmax(iterable, key=None, key_func=None):
+    """
+     Returns a (minimum, maximum) tuple in a single pass. Values are compared in pairs, the smaller one of a pair
+     against the minimum and the larger one against the maximum, about 1.5 comparisons per value instead of 2.
+     key and key_func work as in min and max. On ties the first value wins, as with min and max.
+
+     params: iterable, key [optional], key_func [optional]
+        iterable-> list, sequenece, set, generator etc
+        key-> dictionary key for customizing comparisions in the elements of the iterable
+        key_func-> a function or lambda, as custom key function that customizes comparison way
+
+    Examples:
+    >>> _.minmax([3, 1, 4, 1, 5])
+    >>> (1, 5)
+    >>> _.minmax(stooges, key='age')
+    >>> ({"name": 'moe', "age": 40}, {"name": 'curly', "age": 60})
+    """
+    key_func = itemgetter(key) if key else key_func
+    if key_func is None:
+        key_func = _identity
+    iterator = iter(iterable)
+    try:
+        low = high = next(iterator)
+    except StopIteration:
+        raise ValueError("minmax() arg is an empty sequence")
+    low_key = high_key = key_func(low)
+    for first in iterator:
+        second = next(iterator, _missing)
+        first_key = key_func(first)
+        if second is _missing:
+            if first_key < low_key:
+                low = first
+            elif first_key > high_key:
+                high = first
+            break
+        second_key = key_func(second)
+        if second_key < first_key:
+            if second_key < low_key:
+                low, low_key = second, second_key
+            if first_key > high_key:
+                high, high_key = first, first_key
+        else:
+            if first_key < low_key:
+                low, low_key = first, first_key
+            if second_key > high_key:
+                if first_key < second_key:
+                    high, high_key = second, second_key
+                else:
+                    high, high_key = first, first_key
+    return low, high
+
+
+def _identity(value):
+    return value
+
+
+def sort_by(iterable, key=None, key_func=None, reverse=False, memory_limit=None, argsort=False):
     """
      Returns the sorted iterable in ascending order. If a key is provided, it will 
      be used on each value to generate the criterion by which the value is ranked. If a key_func is provided it will be used as callable for every element to rank the items.
      Only one of the key options will be accepted, if both are given key_func will be ignored
      If reverse is provided, ranking is done in descending order
+     key can be a list of keys, values are then ranked by the first one, ties by the second one etc. A key starting
+     with '-' ranks in descending order. Each key is read once per value, the values are then sorted by one key
+     after the other, from the last one, relying on the sort being stable.
+     With argsort, the positions of the values in sorted order are returned instead of the values.
+     With memory_limit, runs of memory_limit values are sorted in memory, pickled to temporary files and merged back
+     lazily (an external merge sort), the sort stays stable.
     
-     params: iterable, key [optional], key_func [optional], reverse [optional]
+     params: iterable, key [optional], key_func [optional], reverse [optional], memory_limit [optional], argsort [optional]
         iterable-> an iterable of dictionary like objects
-        key-> dictionary key for customizing comparisions in the elements of the iterable
+        key-> dictionary key for customizing comparisions in the elements of the iterable, or a list of them (a tuple
+              is a single key)
         key_func-> a function or lambda, as custom key function that customizes comparison way
         reverse -> boolean, default is Ascending order, True makes is descending
+        memory_limit -> maximum number of values held in memory, beyond it sorted runs are spilled to temporary files
+        argsort -> True to get the list of input positions, in sorted order
+
+    Returns a list. With memory_limit, the list when the iterable has at most memory_limit values, else a generator
+    of the sorted values merged lazily from disk, the temporary files are removed once it is exhausted or closed.
 
     Examples:
     >>> stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}];
@@ -398,38 +1103,184 @@ def sort_by(iterable, key=None, key_func=None, reverse=False):
     >>> [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}]
     >>> _.sort_by(stooges, key='age', reverse=True)
     >>> [{"name": 'curly', "age": 60}, {"name": 'larry', "age": 50}, {"name": 'moe', "age": 40}]
+    >>> _.sort_by(stooges, key='age', argsort=True)
+    >>> [0, 1, 2]
+    >>> _.sort_by(players, key=['country', '-score'])
+    >>> ranked = _.sort_by(event_log, key='score', reverse=True, memory_limit=1000000)
     """
-    key_func = itemgetter(key) if key else key_func
-    return sorted(iterable, key=key_func, reverse=reverse)
+    if memory_limit is not None:
+        key_func, reverse = _sort_key(key, key_func, reverse)
+        if not argsort:
+            return spill.sort(iterable, key_func, reverse, memory_limit)
+        pairs = spill.sort(enumerate(iterable), _on_value(key_func), reverse, memory_limit)
+        indexes = _original_map(itemgetter(0), pairs)
+        return list(indexes) if isinstance(pairs, list) else indexes
+    passes = _sort_passes(key, key_func, reverse)
+    if len(passes) == 1 and not argsort:
+        key_func, reverse = passes[0]
+        return sorted(iterable, key=key_func, reverse=reverse)
+    values = iterable if isinstance(iterable, Sequence) else list(iterable)
+    order = list(range(len(values)))
+    for key_func, reverse in passes:
+        # every key is computed once per value, the sort looks it up by position
+        keys = values if key_func is None else list(_original_map(key_func, values))
+        order.sort(key=keys.__getitem__, reverse=reverse)
+    return order if argsort else list(_original_map(values.__getitem__, order))
+
+
+def sorted_index(sorted_list, value, key=None, key_func=None, reverse=False):
+    """
+     Uses a binary search to determine the position at which value should be inserted into sorted_list in order to
+     keep it sorted, before any equal value. sorted_list is sorted the way sort_by sorts it with the same key, key_func
+     and reverse, which are applied to value as well. Keys are only computed for the log(n) values looked at.
 
+     params: sorted_list, value, key [optional], key_func [optional], reverse [optional]
+        sorted_list -> a list, or any sequence, sorted by sort_by
+        value -> the value to find the position of
+        key, key_func, reverse -> see sort_by
 
-def group_by(iterable, iteratee):
+    Examples:
+    >>> _.sorted_index([10, 20, 30, 40, 50], 35)
+    >>> 3
+    >>> stooges = [{"name": 'moe', "age": 40}, {"name": 'curly', "age": 60}]
+    >>> _.sorted_index(stooges, {"name": 'larry', "age": 50}, key='age')
+    >>> 1
+    """
+    key_func, reverse = _sort_key(key, key_func, reverse)
+    if reverse:
+        key_func = _on_reversed(key_func or _identity)
+    if key_func is None:
+        return bisect.bisect_left(sorted_list, value)
+    return bisect.bisect_left(_Keys(sorted_list, key_func), key_func(value))
+
+
+def _sort_passes(key, key_func, reverse):
+    """
+    Returns the (key_func, reverse) sorts which, applied in turn, give the order of sort_by.
+    """
+    if not isinstance(key, list):
+        return [(itemgetter(key) if key else key_func, reverse)]
+    if not key:
+        raise IllegalArgumentError("sort_by needs at least one key")
+    fields = [(name[1:], not reverse) if isinstance(name, str) and name.startswith('-') else (name, reverse)
+              for name in key]
+    passes = []
+    # consecutive keys in the same direction are sorted together, on a tuple of their values
+    for descending, run in itertools.groupby(fields, itemgetter(1)):
+        passes.append((itemgetter(*[name for name, _ in run]), descending))
+    return passes[::-1]
+
+
+def _sort_key(key, key_func, reverse):
+    """
+    Returns a single (key_func, reverse) ranking values as sort_by does, for merges and binary searches.
+    """
+    passes = _sort_passes(key, key_func, reverse)
+    if len(passes) == 1:
+        return passes[0]
+    parts = [_on_reversed(key_func) if descending else key_func for key_func, descending in reversed(passes)]
+    return (lambda value: tuple([part(value) for part in parts])), False
+
+
+class _Reversed(object):
+    """
+    Sort key ranking in the opposite order of the key it wraps, for the descending parts of a compound key.
+    """
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+class _Keys(object):
+    """
+    Read-only sequence of the keys of a sequence's values, computed when looked up.
+    """
+    __slots__ = ('values', 'key_func')
+
+    def __init__(self, values, key_func):
+        self.values = values
+        self.key_func = key_func
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, position):
+        return self.key_func(self.values[position])
+
+
+def _on_reversed(key_func):
+    return lambda value: _Reversed(key_func(value))
+
+
+def _on_value(key_func):
+    if key_func is None:
+        return itemgetter(1)
+    return lambda pair: key_func(pair[1])
+
+
+def group_by(iterable, iteratee, sorted_input=False, aggregate=None, memory_limit=None):
     """
      Splits an iterable into sets, grouped by the result of running each value through iteratee. 
      If iteratee is a string instead of a function, groups by the property named by iteratee on each of the values. 
+     Works in a single pass over unsorted input, keeping every value in memory.
 
-     params: iterable, iteratee
+     params: iterable, iteratee, sorted_input [optional], aggregate [optional], memory_limit [optional]
         iterable -> a list, tuple, iterator, generator
         iteratee -> a function or a lambda, taking single value as input and returning a transformed value on which iterable will be grouped
+        sorted_input -> True if equal keys are adjacent in iterable, groups are then streamed with O(1) memory
+        aggregate -> optional function called with every group, its result replaces the group (len, sum, a reducer etc)
+        memory_limit -> maximum number of values held in memory, beyond it groups are spilled to temporary files
 
-    Returns a dictionary
+    Returns a dictionary, or with sorted_input a generator of (key, group) tuples where group is an iterator
+    which is only valid until the next tuple is pulled.
+    When values had to be spilled, returns a read-only mapping whose groups are iterators streamed back from disk,
+    see underscore.spill.SpilledGroups. Values and keys must then be picklable.
 
     Examples:
     >>> _.group_by([1.3, 2.1, 2.4], lambda x:math.floor(x))
     >>> {1: [1.3], 2: [2.1, 2.4]}
+    >>> _.group_by([2.1, 1.3, 2.4], math.floor, aggregate=len)
+    >>> {2: 2, 1: 1}
+    >>> for age, names in _.group_by(stooges_sorted_by_age, 'age', sorted_input=True, aggregate=list):
+    >>>     print(age, names)
     """
-    grouped_iterators = itertools.groupby(iterable, iteratee)
-    return dict((x,list(y)) for x,y in grouped_iterators)
+    key_func = itemgetter(iteratee) if isinstance(iteratee, str) else iteratee
+    if sorted_input:
+        groups = itertools.groupby(iterable, key_func)
+        if aggregate is None:
+            return groups
+        return ((key, aggregate(group)) for key, group in groups)
+    if memory_limit is not None:
+        return spill.group(iterable, key_func, memory_limit, aggregate)
+    groups = {}
+    for item in iterable:
+        key = key_func(item)
+        try:
+            groups[key].append(item)
+        except KeyError:
+            groups[key] = [item]
+    if aggregate is not None:
+        return {key: aggregate(group) for key, group in groups.items()}
+    return groups
 
 
-def index_by(iterable, key=None, key_func=None):
+def index_by(iterable, key=None, key_func=None, memory_limit=None):
     """
     Converts a list or iterable into a dictionary by using either key or key_func. 
 
-    params: array, key [optional], key_func [optional]
+    params: array, key [optional], key_func [optional], memory_limit [optional]
         array-> list like iterable
         key -> assuming array as array of dictionaries, key is a dictionary_key which is present in all of the dictionaries.
         key_func->  a function or lambda that takes an element of the iterable and returns the key or index for the dictionary output
+        memory_limit -> maximum number of values held in memory, beyond it values are spilled to temporary files
+            and a read-only mapping reading them back from disk is returned, see underscore.spill.SpilledIndex
 
     Examples:
     >>> stooges = [{"name": 'moe', "age": 40}, {"name": 'larry', "age": 50}, {"name": 'curly', "age": 60}];
@@ -447,76 +1298,106 @@ def index_by(iterable, key=None, key_func=None):
     else:
         raise IllegalArgumentError("Either key or key_func must be passed")
 
+    if memory_limit is not None:
+        return spill.index(iterable, key_maker, memory_limit)
     return {key_maker(item): item for item in iterable}
 
 
-def count_by(iterable, iteratee):
+def count_by(iterable, iteratee, approximate=False, top_k=100, epsilon=0.001, delta=0.01):
     """
     Think of it like a harry potter sorting hat, tells you final number of students in every group.
     Similar to group_by, instead of returning a list with every grouped_key, returns count of grouped elements only.
 
-    params: array, iteratee
+    params: array, iteratee, approximate [optional], top_k [optional], epsilon [optional], delta [optional]
         iterable-> list, set, generator 
-        iteratee-> a function or a lambda for grouping the elements
+        iteratee-> a function or a lambda for grouping the elements, or the name of a property to group by
+        approximate -> True to count in fixed memory, see underscore.sketch.ApproximateCounts
+        top_k -> with approximate, number of most frequent keys tracked for most_common
+        epsilon, delta -> with approximate, a count overestimates by at most epsilon * total with probability 1 - delta
 
     Examples
     >>> _.count_by([1, 2, 3, 4, 5], lambda x: 'even' if x % 2 == 0 else 'odd')
     >>> {"odd": 3, "even": 2}
+    >>> counts = _.count_by(tweets, 'hashtag', approximate=True, top_k=10)
+    >>> counts.most_common(10)
+    >>> counts['#python'], counts.error_bound
     """
-    from collections import defaultdict
-    d = defaultdict(lambda: 0)
-    for item in iterable:
-        key = iteratee(item)
-        d[iteratee(item)] += 1
-    return dict(d)
+    key_func = itemgetter(iteratee) if isinstance(iteratee, str) else iteratee
+    if approximate:
+        counts = sketch.ApproximateCounts(top_k, epsilon, delta)
+        for key in _original_map(key_func, iterable):
+            counts.add(key)
+        return counts
+    return dict(Counter(_original_map(key_func, iterable)))
 
 
-def shuffle(iterable):
+def shuffle(iterable, in_place=False, buffer_size=None, seed=None):
     """
-    Returns a shuffled copy of the list.
-    Caution: DOes not work with unordered collections and generators
-
-    params: iterable
-        iterable -> list, sequenece, 
-
+    Returns a shuffled copy of the list, using a Fisher-Yates shuffle.
+    With in_place the list itself is shuffled and returned, without copying it.
+    With buffer_size the values are streamed instead: a generator is returned which holds at most buffer_size values,
+    every value is swapped with a random one of the buffer. This only shuffles locally, values move forward by
+    about buffer_size positions at most, but works with generators which do not fit in memory.
+
+    params: iterable, in_place [optional], buffer_size [optional], seed [optional]
+        iterable -> list, sequenece, set, generator
+        in_place -> shuffle a list in place instead of returning a copy
+        buffer_size -> number of values held in memory when streaming
+        seed -> an int, or a random.Random, for reproducible shuffles
 
     Examples:
     >>> _.shuffle([1, 2, 3, 4, 5, 6]);
     >>> [4, 1, 6, 3, 5, 2]
+    >>> _.shuffle(training_examples(), buffer_size=10000)
+    >>> <generator object buffered_shuffle at 0x7f...>
     """
-    from random import random
-    return sorted(iterable, key=lambda x: random())
+    random_state = sampling.rng(seed)
+    if buffer_size is not None:
+        if in_place:
+            raise IllegalArgumentError("in_place and buffer_size can not be used together")
+        if buffer_size < 1:
+            raise IllegalArgumentError("buffer_size must be at least 1")
+        return sampling.buffered_shuffle(iterable, buffer_size, random_state)
+    if in_place:
+        if not isinstance(iterable, MutableSequence):
+            raise IllegalArgumentError("in_place needs a mutable sequence such as a list")
+        shuffled = iterable
+    else:
+        shuffled = list(iterable)
+    random_state.shuffle(shuffled)
+    return shuffled
 
 
-def sample(iterable, n_sample):
+def sample(iterable, n_sample=1, weights=None, seed=None):
     """
-     Produce a random sample from the list. Pass a number to return n random elements from the list. Otherwise a single random item will be returned. 
-
-    CAUTION: Does not yet work with generators
-    params: iterable, n_sample
-        iterable -> list, sequenece, set, dictionary
+    Produce a random sample from the list. Pass a number to return n random elements from the list. Otherwise a single random item will be returned.
+    Without weights values are drawn without replacement, all of them are returned (shuffled) if there are fewer than n_sample.
+    Iterables without a length, generators included, are sampled in a single pass holding only n_sample values in memory.
+    With weights values are drawn with replacement, each with probability weight / sum(weights) (Walker's alias method).
+    To draw repeatedly from the same weights, build a sampling.AliasTable once and call its sample method.
+
+    params: iterable, n_sample, weights [optional], seed [optional]
+        iterable -> list, sequenece, set, dictionary, generator
         n_sample -> number of random samples to be taken from iterable
+        weights -> non negative numbers, one per value, or a function returning the weight of a value
+        seed -> an int, or a random.Random, for reproducible samples
 
-    TODO: implement walker's method. current one is too inefficient
-    http://code.activestate.com/recipes/576564-walkers-alias-method-for-random-objects-with-diffe/
     Examples:
     >>> _.sample([1, 2, 3, 4, 5, 6])
     >>> [4]
     >>> _.sample([1, 2, 3, 4, 5, 6], 3)
     >>> [1, 6, 2]
+    >>> _.sample(range(10 ** 9), 3, seed=7)
+    >>> [347712782, 161973069, 423938499]
+    >>> _.sample(['a', 'b', 'c'], 4, weights=[5, 3, 2], seed=42)
+    >>> ['c', 'c', 'a', 'a']
     """
-    try:
-        length = len(iterable)
-    except TypeError:
-        raise TypeError("sample does not work well with generators")
-    import random
-    sampled = []
-    iterable = list(iterable)
-    for i in range(n_sample):
-        chosen = random.choice(iterable)
-        iterable.remove(chosen)
-        sampled.append(chosen)
-    return sampled
+    random_state = sampling.rng(seed)
+    if weights is not None:
+        return sampling.AliasTable(iterable, weights).sample(n_sample, random_state)
+    if isinstance(iterable, Sequence):
+        return random_state.sample(iterable, _original_min(n_sample, len(iterable)))
+    return sampling.reservoir(iterable, n_sample, random_state)
 
 
 def size(iterable):
@@ -541,13 +1422,26 @@ def size(iterable):
         return length
 
 
-def partition(iterable, conditional):
+def partition(iterable, conditional, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None, max_buffer=None, spill=False):
     """
      Splits the iterable into two iterators: one whose elements all satisfy conditional and one whose elements all do not satisfy conditional.
+     The input is read once and conditional is called once per element, so generators work. Elements are buffered for the
+     iterator which is behind while the other one is consumed, an iterator which is closed or garbage collected is no longer buffered for.
 
-     params: iterators, conditional
+     params: iterators, conditional, workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional], max_buffer [optional], spill [optional]
         iterable -> list, sequenece, set, dictionary, generator etc
         conditional -> a lambda or function that takes one input and returns a boolean
+        workers -> optional number of processes (or threads) to run the conditional in
+        chunksize -> number of elements sent to a worker at once, only with workers
+        ordered -> with workers, False yields results as soon as they are ready instead of in input order
+        executor -> 'process' for CPU bound conditionals, which must then be picklable (no lambdas), 'thread' for I/O bound ones
+        prefetch -> maximum number of chunks submitted ahead of the consumer, 2 * workers by default
+        timeout -> seconds each element may take once a worker runs it, a chunk gets timeout * its length,
+            then concurrent.futures.TimeoutError is raised
+        max_buffer -> maximum number of elements buffered for an iterator, going over it raises BufferError
+        spill -> with max_buffer, buffer the elements over max_buffer in a temporary file instead of raising
 
     Examples:
     >>> even, odd = _.partition([1,2,3,4,5,6,7,8,9], lambda x: x % 2 ==0)
@@ -555,5 +1449,95 @@ def partition(iterable, conditional):
     >>> [2,4,6,8]
     >>> list(odd)
     >>> [1,3,5,7,9]
+    >>> errors, rest = _.partition(log_lines(), is_error, max_buffer=100000, spill=True)
+    """
+    # True goes to the first iterator, False to the second
+    return _fan_out(_evaluated(iterable, conditional, workers, chunksize, ordered, executor, prefetch, timeout),
+                    operator.not_, 2, max_buffer, spill)
+
+
+def partition_by(iterable, key_func, buckets, workers=None, chunksize=1, ordered=True,
+        executor='process', prefetch=None, timeout=None, max_buffer=None, spill=False):
+    """
+     Splits the iterable into one iterator per bucket, routing every element by the result of key_func.
+     With a number of buckets, key_func returns an integer and element goes to the iterator at key_func(element) % buckets.
+     With a list of keys, an element goes to the iterator at the position of key_func(element) in the list,
+     an element whose key is not listed raises KeyError.
+     Like partition, the input is read once, key_func is called once per element and elements are buffered for the iterators which are behind.
+
+     params: iterable, key_func, buckets, workers [optional], chunksize [optional], ordered [optional],
+            executor [optional], prefetch [optional], timeout [optional], max_buffer [optional], spill [optional]
+        iterable -> list, sequenece, set, dictionary, generator etc
+        key_func -> a lambda or function returning the key of an element, or the name of a key
+        buckets -> number of iterators, or list of keys
+        other params -> see partition
+
+    Examples:
+    >>> low, high = _.partition_by([1, 20, 3, 40], lambda x: x >= 10, [False, True])
+    >>> list(high)
+    >>> [20, 40]
+    >>> shards = _.partition_by(users, lambda user: user['id'], 8)
+    >>> us, de = _.partition_by(stores, 'country', ['US', 'DE'])
+    """
+    if isinstance(key_func, str):
+        key_func = itemgetter(key_func)
+    if isinstance(buckets, int):
+        count = buckets
+        route = lambda key: key % count
+    else:
+        route = {key: position for position, key in enumerate(buckets)}.__getitem__
+        count = len(buckets)
+    return _fan_out(_evaluated(iterable, key_func, workers, chunksize, ordered, executor, prefetch, timeout),
+                    route, count, max_buffer, spill)
+
+
+def _evaluated(iterable, func, workers, *options):
+    """
+    Returns an iterator of (value, func(value)) tuples.
+    """
+    arguments = _arguments(iterable, func)
+    if workers:
+        return parallel.pairs(func, arguments, workers, *options)
+    values, first = itertools.tee(arguments[0])
+    return zip(values, _original_map(func, first, *arguments[1:]))
+
+
+def _fan_out(pairs, route, count, max_buffer, spill_over):
+    """
+    Splits (value, result) pairs into count lazy iterators, route(result) being the position of the iterator value goes to.
     """
-    return select(iterable, conditional), reject(iterable, conditional)
+    if spill_over and not max_buffer:
+        raise IllegalArgumentError("spill needs a max_buffer")
+    pairs = iter(pairs)
+    buffers = [spill.SpillQueue(max_buffer) if spill_over else deque() for _ in range(count)]
+    limit = None if spill_over else max_buffer
+
+    def side(position):
+        buffer = buffers[position]
+        try:
+            while True:
+                if buffer:
+                    yield buffer.popleft()
+                    continue
+                for value, result in pairs:
+                    target = route(result)
+                    if target == position:
+                        yield value
+                        break
+                    other = buffers[target]
+                    if other is None or sides[target]() is None:
+                        continue
+                    if limit is not None and len(other) >= limit:
+                        raise BufferError("more than {0} values buffered for a partition, "
+                                          "consume the partitions alternately or pass spill=True".format(limit))
+                    other.append(value)
+                else:
+                    return
+        finally:
+            if spill_over:
+                buffer.close()
+            buffers[position] = None
+
+    iterators = tuple(side(position) for position in range(count))
+    sides = [weakref.ref(iterator) for iterator in iterators]
+    return iterators
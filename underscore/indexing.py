@@ -0,0 +1,158 @@
+"""
+Hash indexes over collections of dictionaries or objects, for running many where / find_where lookups against the same records.
+
+Building the index is O(n) per indexed field. A lookup then only looks at the records in the smallest
+hash bucket of the indexed properties: buckets of several indexed properties are intersected, $in
+conditions take the union of the buckets of their values, and the other conditions (on fields which
+are not indexed, or with comparison operators) are checked on the remaining records only, through the
+compiled query. A lookup with no equality on an indexed field scans every record, like collection.where.
+
+The indexed fields of a record are read when it is added. Changing them afterwards is not seen by the
+index, remove the record and add it again instead.
+"""
+import itertools
+from collections.abc import Mapping
+
+from . import query
+
+
+_missing = object()
+
+
+def index(iterable, fields):
+    """
+     Builds an Index over a list of dictionaries or objects, hashing the values of fields. Use it for repeated where / find_where lookups.
+     Lookups take the same queries as where.
+
+     params: iterable, fields
+         iterable-> a list/generator of dictionaries or objects
+         fields-> the keys whose values are indexed
+
+     Examples:
+    >>> plays = _.index(list_of_plays, fields=['author', 'year'])
+    >>> plays.where({'author': 'Shakespeare', 'year': 1611})
+    >>> [{title: "Cymbeline", author: "Shakespeare", year: 1611}, {title: "The Tempest", author: "Shakespeare", year: 1611}]
+    >>> next(plays.find_where({'author': 'Shakespeare', 'title': 'Hamlet'}))
+    >>> {title: "Hamlet", author: "Shakespeare", year: 1601}
+    >>> plays.where({'author': {'$in': ['Jonson', 'Marlowe']}, 'year': {'$lt': 1610}})
+    >>> [{title: "Volpone", author: "Jonson", year: 1606}]
+    """
+    return Index(iterable, fields)
+
+
+class Index(object):
+    """
+    Records with hash buckets for a fixed set of fields. Records can be added and removed, lookups return them in insertion order.
+    """
+
+    def __init__(self, iterable=(), fields=()):
+        self.fields = tuple(fields)
+        # serial -> record, serials increase with insertion so sorting them gives back the insertion order
+        self._records = {}
+        self._serials = itertools.count()
+        # field -> value -> serials of the records with that value
+        self._buckets = {field: {} for field in self.fields}
+        for record in iterable:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(list(self._records.values()))
+
+    def __contains__(self, record):
+        return self._find(record) is not None
+
+    def add(self, record):
+        """
+        Adds record to the index.
+        """
+        serial = next(self._serials)
+        self._records[serial] = record
+        for field, value in self._indexed_items(record):
+            self._buckets[field].setdefault(value, set()).add(serial)
+
+    def remove(self, record):
+        """
+        Removes the first record equal to record, raises ValueError if there is none.
+        """
+        serial = self._find(record)
+        if serial is None:
+            raise ValueError("record is not in the index")
+        record = self._records.pop(serial)
+        for field, value in self._indexed_items(record):
+            bucket = self._buckets[field][value]
+            bucket.discard(serial)
+            if not bucket:
+                del self._buckets[field][value]
+
+    def where(self, properties):
+        """
+        Returns the list of records matching properties, a query as accepted by collection.where.
+        """
+        return [self._records[serial] for serial in sorted(self._matching(properties))]
+
+    def find_where(self, properties):
+        """
+        Returns an iterator of the first record matching properties,
+        empty if nothing is matched, like collection.find_where.
+        """
+        serials = self._matching(properties)
+        return iter([self._records[min(serials)]] if serials else [])
+
+    def _indexed_items(self, record):
+        mapping = isinstance(record, Mapping)
+        for field in self.fields:
+            value = record.get(field, _missing) if mapping else getattr(record, field, _missing)
+            if value is _missing:
+                continue
+            try:
+                hash(value)
+            except TypeError:
+                # unhashable values are left to the scan of the candidates
+                continue
+            yield field, value
+
+    def _matching(self, properties):
+        """
+        Returns the serials of the records matching properties.
+        """
+        buckets = []
+        rest = {}
+        for field, operator, value in query.conditions(properties):
+            bucket = None
+            if field in self._buckets and operator in ('$eq', '$in'):
+                values = self._buckets[field]
+                try:
+                    if operator == '$eq':
+                        bucket = values.get(value, ())
+                    else:
+                        bucket = set().union(*[values.get(one, ()) for one in value])
+                except TypeError:
+                    # unhashable values can only be found by scanning
+                    bucket = None
+            if bucket is None:
+                rest.setdefault(field, {})[operator] = value
+            else:
+                buckets.append(bucket)
+        if buckets:
+            buckets.sort(key=len)
+            serials = set(buckets[0]).intersection(*buckets[1:])
+        else:
+            serials = self._records.keys()
+        if not rest:
+            return set(serials)
+        matches = query.compile(rest)
+        records = self._records
+        return {serial for serial in serials if matches(records[serial])}
+
+    def _find(self, record):
+        serials = self._matching({field: {'$eq': value} for field, value in self._indexed_items(record)})
+        for serial in sorted(serials):
+            if self._records[serial] is record:
+                return serial
+        for serial in sorted(serials):
+            if self._records[serial] == record:
+                return serial
+        return None
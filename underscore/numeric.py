@@ -0,0 +1,329 @@
+"""
+NumPy backed versions of the collection functions, for NumPy arrays and lists of numbers.
+
+    from underscore import numeric
+    evens = numeric.select(array, lambda x: x % 2 == 0)
+
+NumPy is imported the first time one of these functions is called, it is not needed by the rest of
+the library (pip install underscore[numeric]).
+
+Iteratees are called once with the whole array instead of once per element: lambda x: x % 2 == 0
+returns a boolean mask, lambda x: x * 3 the mapped array. When the iteratee does not work on arrays
+(it uses math functions, if/else, builtins like max...) or the input is not numeric (strings, booleans,
+objects, generators), the pure python collection function runs instead, so results are always the same
+values, returned as the same types. Iteratees taking an index are not vectorized.
+
+Values are compared and ordered exactly as in python: stable sorts keep equal values in input order,
+reductions fold from the left, float inputs with NaN take the python path. Integer arithmetic wraps
+around at 64 bits in NumPy where python integers grow, so on integer arrays the iteratee is called a
+second time on the values as floats: unless both calls agree, with results small enough for floats to
+be exact (below 2 ** 53), the python path runs.
+
+An iteratee with side effects can therefore see the whole array once or twice, then every element
+again when the python path runs.
+
+Collections come back as NumPy arrays (tuples of arrays for partition), single values as python
+numbers and count_by as a dictionary.
+"""
+import builtins
+import operator
+
+from . import collection
+from . import sampling
+
+
+_np = None
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("underscore.numeric needs NumPy, pip install numpy")
+        _np = numpy
+    return _np
+
+
+def _array(iterable):
+    """
+    Returns iterable as a numeric NumPy array, None if it is not one.
+    """
+    np = _numpy()
+    if not isinstance(iterable, (np.ndarray, list, tuple, range)):
+        return None
+    array = np.asarray(iterable)
+    # booleans add up to integers in python, NumPy keeps them booleans
+    if array.ndim != 1 or array.dtype.kind not in 'iuf':
+        return None
+    if array.dtype.kind == 'f' and np.isnan(array).any():
+        return None
+    return array
+
+
+def _vectorized(func, array, kind=None):
+    """
+    Returns func(array) if func works on the whole array and returns one value per element, None otherwise.
+    """
+    np = _numpy()
+    if func is None or collection._arity(func) != 1:
+        return None
+    try:
+        # division by zero and invalid operations raise, the python path then raises as it would have
+        with np.errstate(all='raise'):
+            result = func(array)
+            exact = array.dtype.kind not in 'iu' or _exact(result, func(array.astype(float)))
+    except Exception:
+        return None
+    if not exact or not isinstance(result, np.ndarray) or result.shape != array.shape:
+        return None
+    if kind is not None and result.dtype.kind != kind:
+        return None
+    if result.dtype.kind == 'f' and np.isnan(result).any():
+        return None
+    return result
+
+
+def _exact(result, on_floats):
+    """
+    Returns whether result, computed on integers, did not overflow: the same computation on floats gives the same values,
+    and they are small enough for floats to hold them exactly.
+    """
+    np = _numpy()
+    if not isinstance(result, np.ndarray) or not isinstance(on_floats, np.ndarray) or result.shape != on_floats.shape:
+        return False
+    if result.dtype.kind == 'b':
+        return on_floats.dtype.kind == 'b' and bool(np.array_equal(result, on_floats))
+    if result.dtype.kind not in 'iuf' or on_floats.dtype.kind != 'f':
+        return False
+    if len(on_floats) and float(np.abs(on_floats).max()) >= 2 ** 53:
+        return False
+    return bool(np.array_equal(result.astype(float), on_floats))
+
+
+def _values(iterable, array):
+    # the input as python values for the fallback, so iteratees see what collection passes them
+    return array.tolist() if array is not None else iterable
+
+
+def map(iterable, iteratee):
+    """
+    Returns an array of the values mapped through iteratee.
+
+    Examples:
+    >>> numeric.map(np.arange(5), lambda x: x * 3)
+    >>> array([ 0,  3,  6,  9, 12])
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is not None:
+        result = _vectorized(iteratee, array)
+        if result is not None:
+            return result
+    return np.asarray(list(collection.map(_values(iterable, array), iteratee)))
+
+
+def select(iterable, conditional):
+    """
+    Returns an array of the values passing conditional, a boolean mask when conditional works on arrays.
+
+    Examples:
+    >>> numeric.select(np.arange(10), lambda x: x % 3 == 0)
+    >>> array([0, 3, 6, 9])
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is not None:
+        mask = _vectorized(conditional, array, 'b')
+        if mask is not None:
+            return array[mask]
+    return np.asarray(list(collection.select(_values(iterable, array), conditional)))
+
+
+def reject(iterable, conditional):
+    """
+    Returns an array of the values failing conditional.
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is not None:
+        mask = _vectorized(conditional, array, 'b')
+        if mask is not None:
+            return array[~mask]
+    return np.asarray(list(collection.reject(_values(iterable, array), conditional)))
+
+
+def partition(iterable, conditional):
+    """
+    Returns the array of the values passing conditional and the array of the values failing it, conditional is evaluated once.
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is not None:
+        mask = _vectorized(conditional, array, 'b')
+        if mask is not None:
+            return array[mask], array[~mask]
+    accepted, rejected = collection.partition(_values(iterable, array), conditional)
+    accepted = np.asarray(list(accepted))
+    return accepted, np.asarray(list(rejected))
+
+
+_ufuncs = {
+    operator.add: 'add',
+    operator.mul: 'multiply',
+}
+
+
+def reduce(iterable, iteratee, init=collection._missing):
+    """
+    Boils down the values into a single one. operator.add, operator.mul, max and min run as NumPy ufuncs, folding from the left
+    as python does (float sums are not reordered), integer sums and products only when they can not overflow 64 bits.
+
+    Examples:
+    >>> numeric.reduce(np.arange(5), operator.add)
+    >>> 10
+    """
+    np = _numpy()
+    values = array = _array(iterable)
+    if array is not None and init is not collection._missing:
+        array = _array(np.concatenate((np.asarray([init]), array))) if isinstance(init, (int, float)) else None
+    ufunc = _ufunc(iteratee, array)
+    if ufunc is None or len(array) == 0:
+        return collection.reduce(_values(iterable, values), iteratee, init)
+    if array.dtype.kind == 'f' and ufunc in (np.add, np.multiply):
+        # accumulate folds from the left like python, reduce would sum pairwise
+        return ufunc.accumulate(array)[-1].item()
+    return ufunc.reduce(array).item()
+
+
+def _ufunc(iteratee, array):
+    np = _numpy()
+    if array is None:
+        return None
+    if iteratee in (builtins.max, np.maximum):
+        return np.maximum
+    if iteratee in (builtins.min, np.minimum):
+        return np.minimum
+    if iteratee not in _ufuncs or array.dtype.kind == 'b':
+        return None
+    ufunc = getattr(np, _ufuncs[iteratee])
+    if array.dtype.kind in 'iu' and len(array):
+        # python integers do not overflow, 64 bit ones do
+        bound = float(np.abs(array.astype(float)).max())
+        if ufunc is np.add and bound * len(array) >= 2 ** 62:
+            return None
+        if ufunc is np.multiply and bound >= 2 and len(array) * np.log2(bound) >= 62:
+            return None
+    return ufunc
+
+
+def max(iterable, key_func=None, n=None):
+    """
+    Returns the maximum value, or the n largest ones as an array. key_func is vectorized when it works on arrays.
+    """
+    return _extreme(iterable, key_func, n, True)
+
+
+def min(iterable, key_func=None, n=None):
+    """
+    Returns the minimum value, or the n smallest ones as an array. key_func is vectorized when it works on arrays.
+    """
+    return _extreme(iterable, key_func, n, False)
+
+
+def _extreme(iterable, key_func, n, largest):
+    np = _numpy()
+    array = _array(iterable)
+    keys = None
+    if array is not None and len(array):
+        keys = array if key_func is None else _vectorized(key_func, array)
+    if keys is None:
+        function = collection.max if largest else collection.min
+        result = function(_values(iterable, array), key_func=key_func, n=n)
+        return result if n is None else np.asarray(result)
+    if n is None:
+        # argmax and argmin return the first extreme, as python does
+        return array[keys.argmax() if largest else keys.argmin()].item()
+    return array[_stable_order(keys, largest)[:n]]
+
+
+def _stable_order(keys, descending):
+    """
+    Returns the indexes sorting keys, equal keys keeping their input order in both directions, as sorted does.
+    """
+    np = _numpy()
+    if not descending:
+        return np.argsort(keys, kind='stable')
+    reverse = np.argsort(keys[::-1], kind='stable')[::-1]
+    return len(keys) - 1 - reverse
+
+
+def sort_by(iterable, key_func=None, reverse=False):
+    """
+    Returns the values sorted by key_func, or by value, as an array. The sort is stable.
+
+    Examples:
+    >>> numeric.sort_by(np.array([3, -1, 2]), abs)
+    >>> array([-1,  2,  3])
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is not None:
+        keys = array if key_func is None else _vectorized(key_func, array)
+        if keys is not None:
+            return array[_stable_order(keys, reverse)]
+    return np.asarray(collection.sort_by(_values(iterable, array), key_func=key_func, reverse=reverse))
+
+
+def count_by(iterable, iteratee):
+    """
+    Returns a dictionary of the number of values in every group, grouped by iteratee, using numpy.bincount for
+    small ranges of integer keys, numpy.unique otherwise.
+    Groups are in order of first appearance, as with collection.count_by.
+
+    Examples:
+    >>> numeric.count_by(np.arange(10), lambda x: x % 3)
+    >>> {0: 4, 1: 3, 2: 3}
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is not None:
+        keys = _vectorized(iteratee, array)
+        if keys is not None and len(keys):
+            groups, first, counts = _groups(keys)
+            order = np.argsort(first, kind='stable')
+            return dict(zip(groups[order].tolist(), counts[order].tolist()))
+    return collection.count_by(_values(iterable, array), iteratee)
+
+
+def _groups(keys):
+    """
+    Returns the distinct keys, the index of their first appearance and their counts.
+    """
+    np = _numpy()
+    if keys.dtype.kind in 'iu':
+        lowest, highest = keys.min().item(), keys.max().item()
+        span = highest - lowest + 1
+        if span <= builtins.max(len(keys), 1 << 16):
+            # small range of integers, counted in O(n) instead of sorting
+            offsets = keys - lowest
+            counts = np.bincount(offsets, minlength=span)
+            first = np.full(span, len(keys))
+            np.minimum.at(first, offsets, np.arange(len(keys)))
+            present = np.flatnonzero(counts)
+            return (present + lowest).astype(keys.dtype), first[present], counts[present]
+    return np.unique(keys, return_index=True, return_counts=True)
+
+
+def sample(iterable, n_sample=1, weights=None, seed=None):
+    """
+    Returns an array of n_sample random values, the same ones collection.sample returns for the same seed.
+    """
+    np = _numpy()
+    array = _array(iterable)
+    if array is None or weights is not None:
+        return np.asarray(collection.sample(_values(iterable, array), n_sample, weights, seed))
+    # random.sample only looks at the length of the population, so sampling indexes picks the same values
+    indexes = sampling.rng(seed).sample(range(len(array)), builtins.min(n_sample, len(array)))
+    return array[indexes]
@@ -0,0 +1,156 @@
+"""
+Runs iteratees in a pool of processes or threads, used by the collection functions when workers is passed.
+
+The input is consumed lazily in chunks of chunksize elements and at most prefetch chunks are
+in flight at any time, so generators of unbounded length still stream through the pool with
+bounded memory. Results come back in input order, or in completion order with ordered=False.
+
+executor='process' suits CPU bound iteratees. Iteratees are then sent to the worker processes,
+so they have to be picklable: module level functions work, lambdas and nested functions do not.
+executor='thread' suits I/O bound iteratees (http requests, database queries), any callable works.
+
+With timeout, an element whose call has not returned timeout seconds after it could start raises
+concurrent.futures.TimeoutError: a chunk gets timeout * its number of elements, counted from the
+time a worker is free to run it, so chunks waiting in the queue behind busy workers are not timed
+out. Threads can not be interrupted, a timed out call keeps running in the background until it returns.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError, wait
+
+
+_pools = {'process': ProcessPoolExecutor, 'thread': ThreadPoolExecutor}
+
+
+def imap(iteratee, arguments, workers, chunksize=1, ordered=True, executor='process', prefetch=None, timeout=None):
+    """
+    Returns a generator of iteratee's results, arguments is the list of iterables whose elements are passed to iteratee.
+    """
+    chunks = _run(iteratee, arguments, workers, chunksize, ordered, executor, prefetch, timeout)
+    try:
+        for _, results in chunks:
+            yield from results
+    finally:
+        chunks.close()
+
+
+def pairs(iteratee, arguments, workers, chunksize=1, ordered=True, executor='process', prefetch=None, timeout=None):
+    """
+    Returns a generator of (value, result) tuples, value being the first argument iteratee was called with.
+    """
+    chunks = _run(iteratee, arguments, workers, chunksize, ordered, executor, prefetch, timeout)
+    try:
+        for values, results in chunks:
+            yield from zip(values, results)
+    finally:
+        chunks.close()
+
+
+def _apply(iteratee, chunk, star):
+    # runs in the worker
+    if star:
+        return list(itertools.starmap(iteratee, chunk))
+    return list(map(iteratee, chunk))
+
+
+def _run(iteratee, arguments, workers, chunksize, ordered, executor, prefetch, timeout):
+    """
+    Yields (values, results) for every chunk of the input.
+    """
+    if executor not in _pools:
+        raise ValueError("executor must be one of {0}".format(', '.join(sorted(_pools))))
+    prefetch = prefetch or 2 * workers
+    star = len(arguments) > 1
+    inputs = zip(*arguments) if star else iter(arguments[0])
+    chunks = iter(lambda: list(itertools.islice(inputs, chunksize)), [])
+    pool = _pools[executor](max_workers=workers)
+    in_flight = deque() if ordered else {}
+    clock = _Clock(workers)
+
+    def submit(count):
+        for chunk in itertools.islice(chunks, count):
+            future = pool.submit(_apply, iteratee, chunk, star)
+            values = [args[0] for args in chunk] if star else chunk
+            started = clock.submitted(future)
+            if ordered:
+                in_flight.append((values, future, started))
+            else:
+                in_flight[future] = (values, started)
+
+    def remaining(started, size):
+        return None if timeout is None else max(0, clock.start(started) + timeout * size - time.monotonic())
+
+    try:
+        submit(prefetch)
+        if ordered:
+            while in_flight:
+                values, future, started = in_flight.popleft()
+                # the oldest chunk in flight is always running, or done
+                results = future.result(remaining(started, len(values)))
+                # keep the pool busy while the consumer works on this chunk
+                submit(1)
+                yield values, results
+        else:
+            while in_flight:
+                deadline = None
+                if timeout is not None:
+                    running = [remaining(started, len(values))
+                               for values, started in in_flight.values() if started[0] is not None]
+                    deadline = min(running) if running else timeout
+                done, _ = wait(in_flight, deadline, FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError("no result within {0} seconds per element".format(timeout))
+                for future in done:
+                    values, _ = in_flight.pop(future)
+                    submit(1)
+                    yield values, future.result()
+    finally:
+        futures = [future for _, future, _ in in_flight] if ordered else list(in_flight)
+        for future in futures:
+            future.cancel()
+        # once every chunk is done, wait for the pool so its management thread does not hang the interpreter's
+        # exit, otherwise do not block on calls which timed out or on chunks the consumer no longer wants
+        pool.shutdown(wait=not futures)
+
+
+class _Clock(object):
+    """
+    Start times of the chunks submitted to a pool of workers. Pools run chunks in submission order, a chunk
+    starts when it is submitted if a worker is free, or else when a running chunk finishes.
+    """
+
+    def __init__(self, workers):
+        self._free = workers
+        self._queued = deque()
+        # done callbacks run in the pool's threads
+        self._lock = threading.Lock()
+
+    def submitted(self, future):
+        """
+        Returns the start time of the chunk, a list holding None until it starts.
+        """
+        started = [None]
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                started[0] = time.monotonic()
+            else:
+                self._queued.append(started)
+        future.add_done_callback(self._finished)
+        return started
+
+    def _finished(self, future):
+        with self._lock:
+            if self._queued:
+                self._queued.popleft()[0] = time.monotonic()
+            else:
+                self._free += 1
+
+    def start(self, started):
+        with self._lock:
+            if started[0] is None:
+                # the previous chunk finished, its callback has not run yet
+                started[0] = time.monotonic()
+            return started[0]
@@ -0,0 +1,138 @@
+"""
+Compiled queries, the predicates behind where, find_where and the other functions taking properties.
+
+A query maps field names to either a value, which the field has to equal, or a dictionary of operators:
+    {"age": {"$gt": 30, "$lte": 60}, "tag": {"$in": ["python", "go"]}, "country": "US"}
+$eq, $ne, $gt, $gte, $lt and $lte compare the field with the value, $in and $nin check whether the field
+is one of the listed values. A record matches when every condition holds. A record missing one of the
+fields, or whose field can not be compared with the value (None > 30), does not match.
+
+Records are Mappings (fields are keys), or any other object (fields are attributes: namedtuples,
+dataclasses, plain objects).
+
+The source of the predicate is generated once per query shape, the fields and operators used, and cached.
+The values are passed in as arguments, so queries differing only by their values share the same code.
+"""
+import keyword
+from collections.abc import Mapping
+
+from . import collection
+
+
+_operators = {
+    '$eq': '==',
+    '$ne': '!=',
+    '$gt': '>',
+    '$gte': '>=',
+    '$lt': '<',
+    '$lte': '<=',
+    '$in': 'in',
+    '$nin': 'not in',
+}
+
+_compiled = {}
+
+
+def compile(properties):
+    """
+    Returns a predicate which is true for the records matching the query properties.
+
+    Examples:
+    >>> adult = compile({"age": {"$gte": 18}})
+    >>> adult({"name": "moe", "age": 40})
+    >>> True
+    """
+    shape = []
+    arguments = []
+    for field, condition in properties.items():
+        operators = _conditions(condition)
+        shape.append((field, tuple(operator for operator, _ in operators)))
+        arguments.append(field)
+        arguments.extend(_value(operator, value) for operator, value in operators)
+    shape = tuple(shape)
+    if shape not in _compiled:
+        _compiled[shape] = _generate(shape)
+    return _compiled[shape](*arguments)
+
+
+class Query(object):
+    """
+    Picklable compiled query, for sending a query to worker processes. Recompiled on unpickling.
+    """
+
+    def __init__(self, properties):
+        self.properties = properties
+        self._matches = compile(properties)
+
+    def __call__(self, record):
+        return self._matches(record)
+
+    def __reduce__(self):
+        return Query, (self.properties,)
+
+
+def conditions(properties):
+    """
+    Yields (field, operator, value) for every condition of the query properties, equalities having the operator $eq.
+    """
+    for field, condition in properties.items():
+        for operator, value in _conditions(condition):
+            yield field, operator, value
+
+
+def _conditions(condition):
+    if isinstance(condition, dict) and condition and all(isinstance(key, str) and key.startswith('$') for key in condition):
+        for operator in condition:
+            if operator not in _operators:
+                raise collection.IllegalArgumentError("unknown query operator {0}, expected one of {1}".format(
+                    operator, ', '.join(sorted(_operators))))
+        return list(condition.items())
+    return [('$eq', condition)]
+
+
+def _value(operator, value):
+    if operator in ('$in', '$nin'):
+        try:
+            return frozenset(value)
+        except TypeError:
+            return tuple(value)
+    return value
+
+
+def _generate(shape):
+    """
+    Returns a function taking the fields and values of the query, in order, and returning its predicate.
+    """
+    params = []
+    on_mapping = []
+    on_object = []
+    for position, (field, operators) in enumerate(shape):
+        name = 'k%d' % position
+        params.append(name)
+        if isinstance(field, str) and field.isidentifier() and not keyword.iskeyword(field):
+            attribute = 'record.%s' % field
+        else:
+            attribute = 'getattr(record, %s)' % name
+        for count, operator in enumerate(operators):
+            value = 'v%d_%d' % (position, count)
+            params.append(value)
+            on_mapping.append('record[%s] %s %s' % (name, _operators[operator], value))
+            on_object.append('%s %s %s' % (attribute, _operators[operator], value))
+    source = '\n'.join([
+        'def _query(%s):' % ', '.join(params),
+        '    def matches(record):',
+        '        if type(record) is dict or isinstance(record, Mapping):',
+        '            try:',
+        '                return %s' % (' and '.join(on_mapping) or 'True'),
+        '            except (KeyError, TypeError):',
+        '                return False',
+        '        try:',
+        '            return %s' % (' and '.join(on_object) or 'True'),
+        '        except (AttributeError, TypeError):',
+        '            return False',
+        '    return matches',
+        '',
+    ])
+    namespace = {'Mapping': Mapping}
+    exec(source, namespace)
+    return namespace['_query']
@@ -0,0 +1,131 @@
+"""
+Random sampling helpers used by sample and shuffle.
+
+buffered_shuffle shuffles a stream locally: it keeps buffer_size values and yields a random one
+of them for every new value, the way data loaders randomize training streams which do not fit in
+memory. Values can only move forward by about buffer_size positions, a bigger buffer mixes better.
+
+reservoir draws k values without replacement in a single pass over an iterable of unknown
+length, keeping only k values in memory (Li's Algorithm L: O(k * (1 + log(n / k))) random numbers,
+the values in between are skipped with islice instead of being looked at one by one).
+
+AliasTable draws values with replacement according to weights in O(1) per draw, after an
+O(n) setup (Walker's alias method, built with Vose's algorithm). Build it once and reuse it for
+repeated draws.
+"""
+import itertools
+import math
+import random
+
+
+def rng(seed=None):
+    """
+    Returns a random.Random, seed being None, an int (or anything random.seed accepts), or a random.Random to reuse.
+    """
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+
+def reservoir(iterable, k, random_state):
+    """
+    Returns a list of k values drawn without replacement from iterable, or all of them if there are fewer than k,
+    in a random order.
+    """
+    iterator = iter(iterable)
+    sampled = list(itertools.islice(iterator, k))
+    if len(sampled) < k or k == 0:
+        random_state.shuffle(sampled)
+        return sampled
+    w = math.exp(math.log(_open_uniform(random_state)) / k)
+    while True:
+        skip = int(math.log(_open_uniform(random_state)) / math.log(1 - w))
+        for item in itertools.islice(iterator, skip, skip + 1):
+            break
+        else:
+            # values which were never replaced are still in input order
+            random_state.shuffle(sampled)
+            return sampled
+        sampled[random_state.randrange(k)] = item
+        w *= math.exp(math.log(_open_uniform(random_state)) / k)
+
+
+def buffered_shuffle(iterable, buffer_size, random_state):
+    """
+    Yields the values of iterable in a random order, holding at most buffer_size values in memory.
+    """
+    iterator = iter(iterable)
+    buffer = list(itertools.islice(iterator, buffer_size))
+    randrange = random_state.randrange
+    for value in iterator:
+        position = randrange(buffer_size)
+        yield buffer[position]
+        buffer[position] = value
+    random_state.shuffle(buffer)
+    yield from buffer
+
+
+def _open_uniform(random_state):
+    # uniform in (0, 1), logarithms of 0 are undefined
+    u = random_state.random()
+    while u == 0.0:
+        u = random_state.random()
+    return u
+
+
+class AliasTable(object):
+    """
+    Weighted random draws with replacement, each value is drawn with probability weight / sum(weights).
+
+    params: items, weights
+        items -> list, sequenece, generator etc of the values to draw
+        weights -> non negative numbers, one per item, or a function returning the weight of an item
+
+    Examples:
+    >>> table = AliasTable(['a', 'b', 'c'], [5, 3, 2])
+    >>> table.sample(4, seed=42)
+    >>> ['c', 'c', 'a', 'a']
+    """
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        weights = [weights(item) for item in self.items] if callable(weights) else list(weights)
+        if len(weights) != len(self.items):
+            raise ValueError("there must be one weight per item")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("weights can not be negative")
+        total = float(sum(weights))
+        if not total > 0:
+            raise ValueError("at least one weight must be positive")
+        n = len(weights)
+        self._probabilities = [weight * n / total for weight in weights]
+        self._aliases = list(range(n))
+        small = [i for i, p in enumerate(self._probabilities) if p < 1.0]
+        large = [i for i, p in enumerate(self._probabilities) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._aliases[less] = more
+            self._probabilities[more] += self._probabilities[less] - 1.0
+            (small if self._probabilities[more] < 1.0 else large).append(more)
+        # left overs are only off by rounding errors
+        for i in small + large:
+            self._probabilities[i] = 1.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def draw(self, random_state=random):
+        """
+        Returns a single weighted random value.
+        """
+        column = random_state.randrange(len(self._probabilities))
+        if random_state.random() < self._probabilities[column]:
+            return self.items[column]
+        return self.items[self._aliases[column]]
+
+    def sample(self, n_sample=1, seed=None):
+        """
+        Returns a list of n_sample weighted random values, drawn with replacement.
+        """
+        random_state = rng(seed)
+        return [self.draw(random_state) for _ in range(n_sample)]
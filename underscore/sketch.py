@@ -0,0 +1,245 @@
+"""
+Fixed memory summaries of streams, for when exact answers would need memory proportional to the input.
+
+CountMinSketch estimates the count of any key. Estimates never undercount, and overcount by at most
+epsilon * total with probability 1 - delta, using ceil(e / epsilon) * ceil(ln(1 / delta)) counters.
+
+SpaceSaving keeps capacity counters for the most frequent keys (Metwally et al.). Every key seen more
+than total / capacity times is kept, and a kept count overestimates by at most total / capacity.
+
+ApproximateCounts combines both, it is what count_by(..., approximate=True) returns.
+
+BloomFilter answers membership queries without false negatives, and with false positives at rate fp_rate
+once expected_n keys were added, using -expected_n * ln(fp_rate) / ln(2) ** 2 bits. It is what
+membership(..., expected_n=...) returns.
+"""
+import heapq
+import itertools
+import math
+import random
+
+
+_PRIME = (1 << 61) - 1
+
+
+class CountMinSketch(object):
+    """
+    Approximate counts of keys in depth rows of width counters.
+
+    Examples:
+    >>> sketch = CountMinSketch(epsilon=0.001, delta=0.01)
+    >>> for word in words:
+    >>>     sketch.add(word)
+    >>> sketch['the']
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, seed=None):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1.0 / delta)))
+        self.total = 0
+        rng = random.Random(seed)
+        self._hashes = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(self.depth)]
+        self._rows = [[0] * self.width for _ in range(self.depth)]
+
+    def _columns(self, key):
+        h = hash(key)
+        width = self.width
+        return [((a * h + b) % _PRIME) % width for a, b in self._hashes]
+
+    def add(self, key, count=1):
+        """
+        Adds count occurrences of key, returns the new estimate for key.
+        """
+        self.total += count
+        estimate = None
+        for row, column in zip(self._rows, self._columns(key)):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        return estimate
+
+    def __getitem__(self, key):
+        return min(row[column] for row, column in zip(self._rows, self._columns(key)))
+
+    @property
+    def error_bound(self):
+        """
+        Maximum overcount of any estimate, with probability 1 - delta.
+        """
+        return self.epsilon * self.total
+
+
+class SpaceSaving(object):
+    """
+    Counts of the capacity most frequent keys. A new key replaces the least counted one and inherits its count.
+
+    Examples:
+    >>> top = SpaceSaving(100)
+    >>> for hashtag in hashtags:
+    >>>     top.add(hashtag)
+    >>> top.most_common(10)
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.total = 0
+        # key -> [count, overestimation]
+        self._counters = {}
+        # (count, serial, key) entries, stale when the count of key has changed since. The serial breaks ties
+        # so keys, which may be of mixed types or None, are never compared
+        self._heap = []
+        self._serials = itertools.count()
+
+    def add(self, key, count=1):
+        self.total += count
+        counters = self._counters
+        if key in counters:
+            counters[key][0] += count
+        elif len(counters) < self.capacity:
+            counters[key] = [count, 0]
+        else:
+            evicted, minimum = self._pop_minimum()
+            del counters[evicted]
+            counters[key] = [minimum + count, minimum]
+        self._push(key)
+
+    def _push(self, key):
+        heap = self._heap
+        if len(heap) > 4 * self.capacity:
+            heap[:] = [(counter[0], next(self._serials), key) for key, counter in self._counters.items()]
+            heapq.heapify(heap)
+        else:
+            heapq.heappush(heap, (self._counters[key][0], next(self._serials), key))
+
+    def _pop_minimum(self):
+        heap = self._heap
+        while True:
+            count, _, key = heapq.heappop(heap)
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == count:
+                return key, count
+
+    def __contains__(self, key):
+        return key in self._counters
+
+    def __getitem__(self, key):
+        return self._counters[key][0]
+
+    def error(self, key):
+        """
+        Maximum overcount of the count of key.
+        """
+        return self._counters[key][1]
+
+    def most_common(self, n=None):
+        counts = ((key, counter[0]) for key, counter in self._counters.items())
+        if n is None:
+            return sorted(counts, key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(n, counts, key=lambda item: item[1])
+
+
+class ApproximateCounts(object):
+    """
+    Approximate counts of a stream of keys in fixed memory.
+    Any key can be looked up, most_common returns the heaviest hitters.
+    """
+
+    def __init__(self, top_k=100, epsilon=0.001, delta=0.01, seed=None):
+        self.sketch = CountMinSketch(epsilon, delta, seed)
+        self.heavy_hitters = SpaceSaving(top_k)
+
+    def add(self, key, count=1):
+        self.sketch.add(key, count)
+        self.heavy_hitters.add(key, count)
+
+    @property
+    def total(self):
+        return self.sketch.total
+
+    @property
+    def error_bound(self):
+        """
+        Maximum overcount of a count looked up by key, with probability 1 - delta.
+        """
+        return self.sketch.error_bound
+
+    def __getitem__(self, key):
+        estimate = self.sketch[key]
+        if key in self.heavy_hitters:
+            return min(estimate, self.heavy_hitters[key])
+        return estimate
+
+    def most_common(self, n=None):
+        """
+        Returns (key, estimated count) tuples of the n most frequent keys, n being at most top_k.
+        """
+        return [(key, self[key]) for key, _ in self.heavy_hitters.most_common(n)]
+
+
+class BloomFilter(object):
+    """
+    Set membership in a fixed number of bits, sized for expected_n keys at a false positive rate of fp_rate.
+    Keys added are always found, other keys are found with probability error_rate.
+
+    Examples:
+    >>> seen = BloomFilter(expected_n=10 ** 7, fp_rate=0.001)
+    >>> seen.update(user_ids)
+    >>> 'u42' in seen
+    """
+
+    def __init__(self, expected_n, fp_rate=0.01, seed=None):
+        if expected_n < 1 or not 0 < fp_rate < 1:
+            raise ValueError("expected_n must be positive and fp_rate between 0 and 1, got {0} and {1}".format(expected_n, fp_rate))
+        self.expected_n = expected_n
+        self.fp_rate = fp_rate
+        self.size = int(math.ceil(-expected_n * math.log(fp_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, int(round(self.size / float(expected_n) * math.log(2))))
+        self._count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        rng = random.Random(seed)
+        self._hashes = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(2)]
+
+    def _positions(self, key):
+        # enhanced double hashing, k positions from two hashes (Kirsch and Mitzenmacher, Dillinger and Manolios)
+        h = hash(key)
+        (a1, b1), (a2, b2) = self._hashes
+        size = self.size
+        position = (a1 * h + b1) % _PRIME % size
+        # a constant step of 0, or of a large divisor of size, would put the k positions on one or two bits
+        step = (a2 * h + b2) % _PRIME % max(size - 1, 1) + 1
+        for i in range(1, self.hash_count + 1):
+            yield position
+            position = (position + step) % size
+            step = (step + i) % size
+
+    def add(self, key):
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        bits = self._bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        """
+        Number of keys added, counting keys added several times once per add.
+        """
+        return self._count
+
+    @property
+    def error_rate(self):
+        """
+        Expected false positive rate for the keys added so far, above fp_rate once more than expected_n keys were added.
+        """
+        return (1 - math.exp(-self.hash_count * self._count / float(self.size))) ** self.hash_count
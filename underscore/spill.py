@@ -0,0 +1,382 @@
+"""
+Disk backed storage for the collection functions which would otherwise hold their whole input in memory.
+
+Values are buffered in memory and, once the buffer holds memory_limit values, appended as pickles
+to one of a fixed number of temporary partition files, chosen by the hash of their key. Reading a
+group back only scans its own partition. Sorting writes sorted runs of memory_limit values instead,
+merged back lazily, and reversing writes chunks of memory_limit values, read back from the last one. The files live in a temporary directory (see tempfile, the TMPDIR environment
+variable picks the disk) which is removed once the object is garbage collected or closed.
+"""
+import heapq
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+from collections import deque
+from collections.abc import Mapping
+
+from . import collection
+
+
+class SpilledGroups(Mapping):
+    """
+    Read-only mapping of key to the group of values with that key, groups are streamed back from disk.
+    Looking a key up streams its group without loading it. Iterating items loads one partition at a time, memory
+    is then bounded by the largest partition, which holds all the values of its keys: a key having most of the
+    values still loads most of the input. Iterating keys only holds the keys of a partition.
+    """
+
+    def __init__(self, aggregate=None, partitions=64):
+        self._aggregate = aggregate
+        self._partitions = partitions
+        self._directory = tempfile.mkdtemp(prefix='underscore-')
+        self._files = {}
+        self._length = None
+        self._finalizer = weakref.finalize(self, _cleanup, self._files, self._directory)
+
+    def close(self):
+        """
+        Removes the temporary files, the mapping can not be read afterwards.
+        """
+        self._finalizer()
+
+    def _path(self, partition):
+        return os.path.join(self._directory, 'partition-{0}'.format(partition))
+
+    def _partition(self, key):
+        return hash(key) % self._partitions
+
+    def _dump(self, buffer):
+        # buffer maps keys to lists of values, appended to the partition file of every key
+        for key, values in buffer.items():
+            partition = self._partition(key)
+            if partition not in self._files:
+                self._files[partition] = open(self._path(partition), 'wb')
+            pickle.dump((key, values), self._files[partition], pickle.HIGHEST_PROTOCOL)
+        buffer.clear()
+
+    def _finish(self):
+        for spilled in self._files.values():
+            spilled.close()
+
+    def _records(self, partition):
+        if partition not in self._files:
+            return
+        with open(self._path(partition), 'rb') as spilled:
+            while True:
+                try:
+                    yield pickle.load(spilled)
+                except EOFError:
+                    return
+
+    def _stream(self, records, key, first):
+        yield from first
+        for record_key, values in records:
+            if record_key == key:
+                yield from values
+
+    def __getitem__(self, key):
+        records = self._records(self._partition(key))
+        for record_key, values in records:
+            if record_key == key:
+                group = self._stream(records, key, values)
+                return self._aggregate(group) if self._aggregate else group
+        raise KeyError(key)
+
+    def __iter__(self):
+        for partition in sorted(self._files):
+            yield from dict.fromkeys(key for key, _ in self._records(partition))
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(len(set(key for key, _ in self._records(partition))) for partition in self._files)
+        return self._length
+
+    def items(self):
+        """
+        Yields (key, group) tuples, one partition, every group of it in full, is loaded in memory at a time.
+        Look keys up instead to stream large groups.
+        """
+        for partition in sorted(self._files):
+            groups = {}
+            for key, values in self._records(partition):
+                groups.setdefault(key, []).extend(values)
+            for key, group in groups.items():
+                yield key, self._aggregate(group) if self._aggregate else iter(group)
+
+    def values(self):
+        for _, group in self.items():
+            yield group
+
+
+class SpilledIndex(SpilledGroups):
+    """
+    Read-only mapping of key to the last value with that key, as built by index_by.
+    """
+
+    def __getitem__(self, key):
+        found = False
+        for record_key, value in self._records(self._partition(key)):
+            if record_key == key:
+                found, last = True, value
+        if not found:
+            raise KeyError(key)
+        return last
+
+    def _dump(self, buffer):
+        # buffer maps keys to single values
+        for key, value in buffer.items():
+            partition = self._partition(key)
+            if partition not in self._files:
+                self._files[partition] = open(self._path(partition), 'wb')
+            pickle.dump((key, value), self._files[partition], pickle.HIGHEST_PROTOCOL)
+        buffer.clear()
+
+    def items(self):
+        for partition in sorted(self._files):
+            yield from dict(self._records(partition)).items()
+
+
+class SpillQueue(object):
+    """
+    First in first out queue holding at most 2 * memory_limit values in memory, the rest is pickled to a temporary file.
+    Values are appended in memory and written out memory_limit at a time, then read back a batch at a time.
+    """
+
+    def __init__(self, memory_limit):
+        self._memory_limit = memory_limit
+        # oldest values, read back from disk, then the spilled batches, then the newest values
+        self._head = deque()
+        self._tail = deque()
+        self._spilled = 0
+        self._length = 0
+        self._directory = None
+        self._files = {}
+        self._finalizer = None
+
+    def close(self):
+        """
+        Removes the temporary file, if anything was spilled.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def _open(self):
+        self._directory = tempfile.mkdtemp(prefix='underscore-')
+        path = os.path.join(self._directory, 'queue')
+        self._files['write'] = open(path, 'wb')
+        self._files['read'] = open(path, 'rb')
+        self._finalizer = weakref.finalize(self, _cleanup, self._files, self._directory)
+
+    def append(self, value):
+        self._tail.append(value)
+        self._length += 1
+        if len(self._tail) >= self._memory_limit:
+            if self._directory is None:
+                self._open()
+            pickle.dump(list(self._tail), self._files['write'], pickle.HIGHEST_PROTOCOL)
+            self._files['write'].flush()
+            self._spilled += 1
+            self._tail.clear()
+
+    def popleft(self):
+        if not self._head:
+            if self._spilled:
+                self._head.extend(pickle.load(self._files['read']))
+                self._spilled -= 1
+            else:
+                self._head, self._tail = self._tail, self._head
+        value = self._head.popleft()
+        self._length -= 1
+        return value
+
+    def __len__(self):
+        return self._length
+
+
+class SortedRuns(object):
+    """
+    Sorted runs of values pickled to temporary files, a block of values at a time, merged back with heapq.merge.
+    At most fan_in runs are merged at once, more runs are first merged into longer ones, so the number of open
+    files and the blocks held in memory stay bounded.
+    """
+
+    def __init__(self, key_func=None, reverse=False, block_size=1024, fan_in=64):
+        self._key_func = key_func
+        self._reverse = reverse
+        self._block_size = block_size
+        self._fan_in = fan_in
+        self._directory = tempfile.mkdtemp(prefix='underscore-')
+        self._runs = []
+        self._serials = itertools.count()
+        self._files = {}
+        self._finalizer = weakref.finalize(self, _cleanup, self._files, self._directory)
+
+    def close(self):
+        """
+        Removes the temporary files, the runs can not be merged afterwards.
+        """
+        self._finalizer()
+
+    def add(self, values):
+        """
+        Writes values, already sorted, as a new run. Runs are merged in the order they were added,
+        equal values keep that order, so sorting consecutive chunks of the input gives a stable sort.
+        """
+        path = os.path.join(self._directory, 'run-{0}'.format(next(self._serials)))
+        with open(path, 'wb') as run:
+            iterator = iter(values)
+            for block in iter(lambda: list(itertools.islice(iterator, self._block_size)), []):
+                pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+        self._runs.append(path)
+
+    def _read(self, path):
+        with open(path, 'rb') as run:
+            while True:
+                try:
+                    block = pickle.load(run)
+                except EOFError:
+                    return
+                yield from block
+
+    def _merge(self, paths):
+        return heapq.merge(*[self._read(path) for path in paths], key=self._key_func, reverse=self._reverse)
+
+    def merged(self):
+        """
+        Yields every value of every run in sorted order, the files are removed once the generator is exhausted or closed.
+        """
+        try:
+            while len(self._runs) > self._fan_in:
+                # consecutive runs are merged into one, in order, so equal values still come out in input order
+                level, self._runs = self._runs, []
+                for start in range(0, len(level), self._fan_in):
+                    paths = level[start:start + self._fan_in]
+                    self.add(self._merge(paths))
+                    for path in paths:
+                        os.remove(path)
+            yield from self._merge(self._runs)
+        finally:
+            self.close()
+
+
+def sort(iterable, key_func, reverse, memory_limit, fan_in=64):
+    """
+    Sorts iterable holding about memory_limit values in memory.
+    Returns a sorted list if everything fitted, a generator merging sorted runs from disk otherwise.
+    """
+    _check(memory_limit)
+    iterator = iter(iterable)
+    # one more value tells an input of exactly memory_limit values, which fits, from a larger one
+    chunk = list(itertools.islice(iterator, memory_limit + 1))
+    if len(chunk) <= memory_limit:
+        chunk.sort(key=key_func, reverse=reverse)
+        return chunk
+    iterator = itertools.chain(chunk[memory_limit:], iterator)
+    del chunk[memory_limit:]
+    # every run is read back a block at a time, fan_in of them at once while merging
+    runs = SortedRuns(key_func, reverse, max(1, memory_limit // fan_in), fan_in)
+    while chunk:
+        chunk.sort(key=key_func, reverse=reverse)
+        runs.add(chunk)
+        chunk = list(itertools.islice(iterator, memory_limit))
+    return runs.merged()
+
+
+def reverse(iterable, memory_limit):
+    """
+    Reverses iterable holding at most 2 * memory_limit values in memory.
+    Returns a reversed list if everything fitted, a generator reading chunks back from disk otherwise.
+    """
+    _check(memory_limit)
+    iterator = iter(iterable)
+    chunk = list(itertools.islice(iterator, memory_limit))
+    if len(chunk) < memory_limit:
+        chunk.reverse()
+        return chunk
+    return _reversed_chunks(chunk, iterator, memory_limit)
+
+
+def _reversed_chunks(chunk, iterator, memory_limit):
+    directory = tempfile.mkdtemp(prefix='underscore-')
+    files = {}
+    try:
+        files['chunks'] = spilled = open(os.path.join(directory, 'chunks'), 'w+b')
+        offsets = []
+        while True:
+            following = list(itertools.islice(iterator, memory_limit))
+            if not following:
+                break
+            offsets.append(spilled.tell())
+            pickle.dump(chunk, spilled, pickle.HIGHEST_PROTOCOL)
+            chunk = following
+        yield from reversed(chunk)
+        for offset in reversed(offsets):
+            spilled.seek(offset)
+            yield from reversed(pickle.load(spilled))
+    finally:
+        _cleanup(files, directory)
+
+
+def group(iterable, key_func, memory_limit, aggregate=None, partitions=64):
+    """
+    Groups iterable by key_func holding at most memory_limit values in memory.
+    Returns a plain dictionary of lists if everything fitted, a SpilledGroups otherwise.
+    """
+    _check(memory_limit)
+    buffer = {}
+    buffered = 0
+    store = None
+    for item in iterable:
+        key = key_func(item)
+        try:
+            buffer[key].append(item)
+        except KeyError:
+            buffer[key] = [item]
+        buffered += 1
+        if buffered >= memory_limit:
+            if store is None:
+                store = SpilledGroups(aggregate, partitions)
+            store._dump(buffer)
+            buffered = 0
+    if store is None:
+        if aggregate is not None:
+            return {key: aggregate(values) for key, values in buffer.items()}
+        return buffer
+    store._dump(buffer)
+    store._finish()
+    return store
+
+
+def index(iterable, key_func, memory_limit, partitions=64):
+    """
+    Indexes iterable by key_func holding at most memory_limit values in memory.
+    Returns a plain dictionary if everything fitted, a SpilledIndex otherwise.
+    """
+    _check(memory_limit)
+    buffer = {}
+    store = None
+    for item in iterable:
+        buffer[key_func(item)] = item
+        if len(buffer) >= memory_limit:
+            if store is None:
+                store = SpilledIndex(partitions=partitions)
+            store._dump(buffer)
+    if store is None:
+        return buffer
+    store._dump(buffer)
+    store._finish()
+    return store
+
+
+def _check(memory_limit):
+    if memory_limit < 1:
+        raise collection.IllegalArgumentError("memory_limit must be at least 1, got {0}".format(memory_limit))
+
+
+def _cleanup(files, directory):
+    for spilled in files.values():
+        spilled.close()
+    shutil.rmtree(directory, ignore_errors=True)